@@ -0,0 +1,107 @@
+"""슬라이드쇼 엔진/모션 벤치마크 (filter vs concat, static vs kenburns)
+
+이미지 개수별로 create_video_from_images()를 별도 프로세스에서 실행하고
+경과 시간, CPU 시간(FFmpeg 포함), 최대 RSS를 비교한다.
+kenburns 모션은 엔진과 관계없이 rawpipe로 렌더링되므로 모션 비교는 rawpipe 엔진 기준으로 보면 된다.
+
+사용법:
+    python benchmarks/bench_slideshow.py --sizes 3,20,100 --engines filter,concat
+    python benchmarks/bench_slideshow.py --sizes 3,20 --engines rawpipe --motions static,kenburns
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+RUNNER = (
+    "import sys\n"
+    "from scripts.create_video import create_video_from_images\n"
+    "sys.exit(0 if create_video_from_images() else 1)\n"
+)
+
+
+def make_images(output_dir, count, seed=0):
+    """크기와 색이 제각각인 합성 이미지 생성"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    paths = []
+    for i in range(1, count + 1):
+        size = rng.choice([(1600, 1200), (1080, 1920), (800, 800), (2400, 1600)])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        img = Image.new("RGB", size, color)
+        draw = ImageDraw.Draw(img)
+        for _ in range(20):
+            x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+            draw.rectangle([x0, y0, x0 + 200, y0 + 200], fill=tuple(rng.randrange(256) for _ in range(3)))
+        path = output_dir / f"image_{i:03d}.jpg"
+        img.save(path, "JPEG", quality=90)
+        paths.append(str(path))
+    return paths
+
+
+def run_engine(work_dir, engine, motion="static"):
+    """엔진 하나를 새 프로세스에서 실행하고 자원 사용량 측정 (wait4로 자식 프로세스 포함)"""
+    env = dict(os.environ, SLIDESHOW_ENGINE=engine, MOTION_MODE=motion, PYTHONPATH=str(PROJECT_ROOT))
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", RUNNER],
+        cwd=work_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        "engine": engine,
+        "motion": motion,
+        "ok": proc.returncode == 0,
+        "wall_s": round(time.perf_counter() - started, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "max_rss_mb": round(usage.ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="슬라이드쇼 엔진 벤치마크")
+    parser.add_argument("--sizes", default="3,20,100", help="이미지 개수 목록 (쉼표 구분)")
+    parser.add_argument("--engines", default="filter,concat", help="비교할 엔진 (쉼표 구분)")
+    parser.add_argument("--motions", default="static", help="비교할 모션 모드 (쉼표 구분, static,kenburns)")
+    parser.add_argument("--json", dest="json_path", default=None, help="결과를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    engines = args.engines.split(",")
+    motions = args.motions.split(",")
+    results = []
+
+    print(f"{'images':>6} {'engine':<8} {'motion':<9} {'ok':<3} {'wall(s)':>8} {'cpu(s)':>8} {'rss(MB)':>8}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = Path(tmp)
+            output_dir = work_dir / "output"
+            output_dir.mkdir()
+            image_paths = make_images(output_dir, size)
+            with open(output_dir / "metadata.json", "w", encoding="utf-8") as f:
+                json.dump({"image_paths": image_paths}, f)
+
+            for engine in engines:
+                for motion in motions:
+                    result = {"images": size, **run_engine(work_dir, engine, motion)}
+                    results.append(result)
+                    print(f"{size:>6} {engine:<8} {motion:<9} {'y' if result['ok'] else 'n':<3} "
+                          f"{result['wall_s']:>8.2f} {result['cpu_s']:>8.2f} {result['max_rss_mb']:>8.1f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
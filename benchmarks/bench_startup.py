@@ -0,0 +1,98 @@
+"""CLI 시작 시간 측정 (명령별 모듈 import 시간 vs 시작 시간 예산)
+
+python -m scripts <명령>이 실제 작업을 시작하기 전까지 드는 시간, 즉 명령 모듈을 import하는 데 걸리는
+시간을 새 프로세스에서 반복 측정한다. 빈 인터프리터 시작 시간을 뺀 중앙값이 예산
+(config.yaml startup.budget_ms, 기본값 150ms)을 넘는 명령이 있으면 종료 코드 1로 끝나므로 CI에서 회귀를 잡을 수 있다.
+--top을 주면 명령별로 누적 import 시간이 가장 긴 모듈을 보여준다 (python -X importtime).
+
+사용법:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --budget-ms 100 --top 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.__main__ import COMMANDS
+
+DEFAULT_BUDGET_MS = 150
+
+
+def run_python(code, *flags):
+    """새 인터프리터에서 code 실행. 반환값: (경과 시간(초), stderr)"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, *flags, "-c", code], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return elapsed, proc.stderr
+
+
+def measure(module, repeat):
+    """모듈 import 시간 중앙값(초)"""
+    return statistics.median(run_python(f"import {module}")[0] for _ in range(repeat))
+
+
+def heaviest_imports(module, top):
+    """-X importtime 결과에서 누적 시간이 가장 긴 모듈 (이름, ms)"""
+    _, stderr = run_python(f"import {module}", "-X", "importtime")
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        rows.append((name.strip(), int(cumulative) / 1000))
+    rows = [row for row in rows if row[0] != module]
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def budget_from_config():
+    from scripts.utils import load_config
+
+    cwd = os.getcwd()
+    os.chdir(PROJECT_ROOT)
+    try:
+        return ((load_config() or {}).get("startup") or {}).get("budget_ms", DEFAULT_BUDGET_MS)
+    finally:
+        os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI 시작 시간 측정")
+    parser.add_argument("--repeat", type=int, default=5, help="명령별 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="명령별 시작 시간 예산 (기본값: startup.budget_ms)")
+    parser.add_argument("--top", type=int, default=0, help="명령별로 보여줄 가장 무거운 import 수")
+    args = parser.parse_args()
+
+    budget_ms = args.budget_ms or budget_from_config()
+    baseline = statistics.median(run_python("pass")[0] for _ in range(args.repeat))
+    print(f"인터프리터 시작: {baseline * 1000:.1f}ms, 예산: 명령당 {budget_ms:.0f}ms (인터프리터 제외)\n")
+    print(f"{'command':<18} {'import(ms)':>10} {'budget':>7}")
+
+    over = []
+    for name, (module, _) in COMMANDS.items():
+        import_ms = max(0.0, measure(module, args.repeat) - baseline) * 1000
+        ok = import_ms <= budget_ms
+        if not ok:
+            over.append(name)
+        print(f"{name:<18} {import_ms:>10.1f} {'ok' if ok else 'OVER':>7}")
+        for heavy, ms in heaviest_imports(module, args.top) if args.top else []:
+            print(f"    {ms:>8.1f}ms  {heavy}")
+
+    if over:
+        print(f"\n❌ 예산 초과: {', '.join(over)}")
+        sys.exit(1)
+    print("\n✅ 모든 명령이 예산 안에서 시작합니다.")
+
+
+if __name__ == "__main__":
+    main()
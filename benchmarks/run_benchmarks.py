@@ -0,0 +1,285 @@
+"""오프라인 end-to-end 벤치마크
+
+외부 API를 로컬 대체 서버(stubs.py)로 바꾸고, 슬라이드 수별로 각 단계와 전체 파이프라인을
+별도 프로세스에서 실행해 경과 시간, FFmpeg(자식 프로세스) CPU 시간, 최대 RSS, 기록한 바이트 수를 측정한다.
+결과는 benchmarks/results/<시각>_<커밋>.json에 저장되며 --compare로 두 결과를 비교할 수 있다.
+
+사용법:
+    python benchmarks/run_benchmarks.py --sizes 3,20,200 --latency-ms 150
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stubs import StandInServer
+
+STAGES = [
+    "generate_prompt",
+    "generate_images",
+    "generate_audio",
+    "plan_timeline",
+    "create_video",
+    "generate_subtitle",
+    "edit_video",
+]
+
+SCRIPT_SENTENCE = "벤치마크를 위한 합성 문장입니다."
+
+
+def synthetic_prompts(count):
+    """슬라이드 수만큼의 합성 이미지 프롬프트와 그에 비례하는 길이의 스크립트"""
+    prompts = [f"benchmark slide {i:03d}, synthetic scenery" for i in range(1, count + 1)]
+    script = " ".join(SCRIPT_SENTENCE for _ in range(max(1, count // 2)))
+    return prompts, script
+
+
+def apply_synthetic_prompts(metadata, count):
+    """generate_prompt 결과를 슬라이드 수에 맞는 합성 프롬프트로 교체"""
+    from scripts.generate_prompt import generate_prompt
+
+    generate_prompt(metadata)
+    prompts, script = synthetic_prompts(count)
+    metadata.update({"image_prompts": prompts, "script": script, "num_images": count})
+    return metadata
+
+
+def run_stage_in_process(stage, count, result_file):
+    """(자식 프로세스에서 실행) 단계 하나를 실행하고 자원 사용량을 result_file에 기록"""
+    from scripts.utils import load_metadata, save_metadata
+
+    if stage == "pipeline":
+        from scripts.pipeline import build_stages, run_pipeline
+
+        stages = build_stages()
+        for item in stages:
+            if item.name == "generate_prompt":
+                item.func = lambda metadata: apply_synthetic_prompts(metadata, count)
+        ok = bool(run_pipeline(stages, force=("all",)))
+    elif stage == "generate_prompt":
+        metadata = apply_synthetic_prompts({}, count)
+        save_metadata(metadata)
+        ok = True
+    else:
+        import importlib
+
+        module_name, func_name = {
+            "generate_images": ("scripts.generate_image", "generate_images"),
+            "plan_timeline": ("scripts.timeline", "plan_timeline"),
+            "create_video": ("scripts.create_video", "create_video_from_images"),
+            "generate_subtitle": ("scripts.generate_subtitle", "generate_subtitle"),
+            "generate_audio": ("scripts.generate_audio", "generate_audio"),
+            "edit_video": ("scripts.edit_video", "edit_video"),
+        }[stage]
+        func = getattr(importlib.import_module(module_name), func_name)
+        metadata = load_metadata()
+        ok = bool(func(metadata))
+        save_metadata(metadata)
+
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "ok": ok,
+            "python_cpu_s": self_usage.ru_utime + self_usage.ru_stime,
+            "ffmpeg_cpu_s": child_usage.ru_utime + child_usage.ru_stime,
+            "python_max_rss_mb": self_usage.ru_maxrss / 1024,
+            "ffmpeg_max_rss_mb": child_usage.ru_maxrss / 1024,
+        }, f)
+
+
+def directory_bytes(*paths):
+    """디렉토리 아래 모든 파일 크기 합"""
+    total = 0
+    for path in paths:
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+    return total
+
+
+def measure(stage, count, work_dir, env):
+    """단계를 새 프로세스로 실행하고 측정값 반환"""
+    result_file = work_dir / f".{stage}.result.json"
+    bytes_before = directory_bytes(work_dir / "output", work_dir / "cache")
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, __file__, "--run-stage", stage, "--count", str(count), "--result-file", str(result_file)],
+        cwd=work_dir, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+
+    usage = {}
+    if result_file.exists():
+        with open(result_file, "r", encoding="utf-8") as f:
+            usage = json.load(f)
+        result_file.unlink()
+
+    return {
+        "stage": stage,
+        "images": count,
+        "ok": proc.returncode == 0 and usage.get("ok", False),
+        "wall_s": round(wall, 3),
+        "ffmpeg_cpu_s": round(usage.get("ffmpeg_cpu_s", 0.0), 3),
+        "python_cpu_s": round(usage.get("python_cpu_s", 0.0), 3),
+        "peak_rss_mb": round(max(usage.get("python_max_rss_mb", 0.0), usage.get("ffmpeg_max_rss_mb", 0.0)), 1),
+        "bytes_written": directory_bytes(work_dir / "output", work_dir / "cache") - bytes_before,
+        "stderr_tail": proc.stderr[-500:] if proc.returncode else "",
+    }
+
+
+def write_benchmark_config(work_dir):
+    """프로젝트 config.yaml을 작업 디렉토리에 복사하되 벤치마크에 맞게 일부 값을 바꿈
+
+    - 캐시는 작업 디렉토리 안에만 둔다 (요청 한도 버킷 상태가 실제 캐시와 섞이지 않도록)
+    - 제공자별 요청 한도(rate_per_hour)를 끈다. 대체 서버를 상대로 프로덕션 한도(Unsplash 시간당 50회)를
+      적용하면 큰 시나리오에서 버킷이 바닥나 fallback 경로를 측정하게 된다.
+    """
+    import yaml
+    from scripts.http_client import PROVIDERS
+
+    config = {}
+    if (PROJECT_ROOT / "config.yaml").exists():
+        with open(PROJECT_ROOT / "config.yaml", "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+
+    config.setdefault("cache", {})["dir"] = str(work_dir / "cache")
+    http_config = config.get("http") or {}
+    providers = http_config.get("providers") or {}
+    for provider in sorted(set(PROVIDERS) | set(providers)):
+        providers[provider] = dict(providers.get(provider) or {}, rate_per_hour=None)
+    config["http"] = dict(http_config, providers=providers)
+
+    with open(work_dir / "config.yaml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+
+
+def run_scenario(count, server, render_mode):
+    """슬라이드 수 하나에 대해 단계별 실행 + 전체 파이프라인 실행"""
+    results = []
+    for run in ("stages", "pipeline"):
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = Path(tmp)
+            (work_dir / "output").mkdir()
+            env = dict(
+                os.environ,
+                PYTHONPATH=str(PROJECT_ROOT),
+                UNSPLASH_ACCESS_KEY="benchmark",
+                UNSPLASH_API_URL=server.url,
+                ELEVENLABS_API_KEY="benchmark",
+                ELEVENLABS_API_URL=server.url,
+                OPENAI_API_KEY="benchmark",
+                OPENAI_API_URL=server.url,
+                AUTOVIDEO_CACHE_DIR=str(work_dir / "cache"),
+                RENDER_MODE=render_mode,
+            )
+            write_benchmark_config(work_dir)
+
+            stages = STAGES if run == "stages" else ["pipeline"]
+            for stage in stages:
+                if render_mode == "single_pass" and stage == "create_video":
+                    continue
+                result = measure(stage, count, work_dir, env)
+                results.append(result)
+                print(f"{count:>6} {stage:<18} {'y' if result['ok'] else 'n':<3} {result['wall_s']:>8.2f} "
+                      f"{result['ffmpeg_cpu_s']:>8.2f} {result['peak_rss_mb']:>8.1f} "
+                      f"{result['bytes_written'] / 1024 / 1024:>9.1f}")
+    return results
+
+
+def environment_info():
+    """결과 비교에 필요한 실행 환경 정보"""
+    def command_output(cmd):
+        try:
+            return subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_ROOT).stdout.strip()
+        except OSError:
+            return ""
+
+    return {
+        "commit": command_output(["git", "rev-parse", "--short", "HEAD"]),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": command_output(["ffmpeg", "-version"]).split("\n")[0],
+    }
+
+
+def compare(old_path, new_path):
+    """두 결과 파일의 단계별 경과 시간 비교"""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {(r["images"], r["stage"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = {(r["images"], r["stage"]): r for r in json.load(f)["results"]}
+
+    print(f"{'images':>6} {'stage':<18} {'old(s)':>8} {'new(s)':>8} {'change':>8}")
+    for key in sorted(set(old) & set(new)):
+        before, after = old[key]["wall_s"], new[key]["wall_s"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{key[0]:>6} {key[1]:<18} {before:>8.2f} {after:>8.2f} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 end-to-end 벤치마크")
+    parser.add_argument("--sizes", default="3,20,200", help="슬라이드 수 목록 (쉼표 구분)")
+    parser.add_argument("--latency-ms", type=int, default=150, help="대체 서버 요청당 지연 시간")
+    parser.add_argument("--render-mode", default="single_pass", help="RENDER_MODE (two_pass / single_pass)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본값: benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 파일 비교")
+    # 내부용: 자식 프로세스에서 단계 하나 실행
+    parser.add_argument("--run-stage", help=argparse.SUPPRESS)
+    parser.add_argument("--count", type=int, default=3, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage_in_process(args.run_stage, args.count, args.result_file)
+        return
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment_info(),
+        "settings": {"sizes": sizes, "latency_ms": args.latency_ms, "render_mode": args.render_mode},
+        "results": [],
+    }
+
+    print(f"{'images':>6} {'stage':<18} {'ok':<3} {'wall(s)':>8} {'ffcpu(s)':>8} {'rss(MB)':>8} {'written(MB)':>9}")
+    with StandInServer(latency_ms=args.latency_ms) as server:
+        for size in sizes:
+            report["results"].extend(run_scenario(size, server, args.render_mode))
+        report["stand_in_requests"] = server.requests
+
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output_path = RESULTS_DIR / f"{stamp}_{report['environment']['commit'] or 'nogit'}.json"
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 결과 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
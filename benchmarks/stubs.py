@@ -0,0 +1,189 @@
+"""외부 API 로컬 대체 서버 (Unsplash, 이미지 CDN, ElevenLabs, OpenAI Whisper)
+
+네트워크 없이 파이프라인 전체를 실행하기 위한 HTTP 서버다. 모든 요청에 설정한 지연 시간을 더하고,
+이미지/오디오는 요청한 크기와 길이에 맞춰 합성해 응답한다 (같은 크기/길이는 한 번만 생성).
+
+failures로 경로별 처음 N개 요청을 503(Retry-After 포함)으로 응답하게 해 재시도 동작을 확인할 수 있다.
+
+사용 예:
+    with StandInServer(latency_ms=150, failures={"unsplash": 2}) as server:
+        os.environ["UNSPLASH_API_URL"] = server.url
+        os.environ["ELEVENLABS_API_URL"] = server.url
+"""
+import io
+import json
+import re
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 합성 음성 길이 추정: 한국어 낭독 속도 약 초당 6자
+CHARS_PER_SECOND = 6.0
+
+
+class StandInServer:
+    """별도 스레드에서 동작하는 로컬 API 대체 서버"""
+
+    def __init__(self, latency_ms=0, host="127.0.0.1", port=0, failures=None, retry_after=0):
+        self.latency = latency_ms / 1000.0
+        self.requests = {}
+        self.failures = dict(failures or {})
+        self.retry_after = retry_after
+        self._images = {}
+        self._audio = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, route):
+        """요청 수를 세고, 이 요청을 실패로 응답해야 하면 True"""
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            if self.failures.get(route, 0) > 0:
+                self.failures[route] -= 1
+                return True
+            return False
+
+    def image_bytes(self, width, height, seed):
+        """요청 크기의 합성 JPEG (그라데이션 + 노이즈로 실제 사진과 비슷한 크기)"""
+        key = (width, height, seed % 8)
+        with self._lock:
+            if key in self._images:
+                return self._images[key]
+
+        from PIL import Image
+
+        gradient = Image.linear_gradient("L").resize((width, height))
+        noise = Image.effect_noise((width, height), 48 + key[2] * 8)
+        image = Image.merge("RGB", (gradient, noise, gradient.rotate(180)))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        data = buffer.getvalue()
+
+        with self._lock:
+            self._images[key] = data
+        return data
+
+    def audio_bytes(self, text):
+        """텍스트 길이에 비례하는 길이의 합성 MP3 (0.5초 단위로 재사용)"""
+        seconds = max(1.0, round(len(text) / CHARS_PER_SECOND * 2) / 2)
+        with self._lock:
+            if seconds in self._audio:
+                return self._audio[seconds]
+
+        result = subprocess.run(
+            [
+                "ffmpeg", "-v", "error",
+                "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+                "-ac", "1", "-ar", "44100", "-b:a", "128k", "-f", "mp3", "pipe:1"
+            ],
+            capture_output=True, check=True
+        )
+        with self._lock:
+            self._audio[seconds] = result.stdout
+        return result.stdout
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, payload, status=200):
+                self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+            def _fail(self):
+                body = b'{"error": "service unavailable"}'
+                self.send_response(503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Retry-After", str(server.retry_after))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+
+                if parsed.path == "/photos/random":
+                    if server._count("unsplash"):
+                        self._fail()
+                        return
+                    width = int(query.get("w", ["1080"])[0])
+                    height = int(query.get("h", ["1920"])[0])
+                    seed = abs(hash(query.get("query", [""])[0]))
+                    self._send_json({"urls": {"regular": f"{server.url}/images/{seed}.jpg?w={width}&h={height}"}})
+                    return
+
+                match = re.fullmatch(r"/images/(\d+)\.jpg", parsed.path)
+                if match:
+                    if server._count("image"):
+                        self._fail()
+                        return
+                    width = int(query.get("w", ["1080"])[0])
+                    height = int(query.get("h", ["1920"])[0])
+                    self._send(200, server.image_bytes(width, height, int(match.group(1))), "image/jpeg")
+                    return
+
+                self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                time.sleep(server.latency)
+                parsed = urlparse(self.path)
+                body = self._read_body()
+
+                if re.fullmatch(r"/v1/text-to-speech/[^/]+(/stream)?", parsed.path):
+                    if server._count("elevenlabs"):
+                        self._fail()
+                        return
+                    text = json.loads(body or b"{}").get("text", "")
+                    self._send(200, server.audio_bytes(text), "audio/mpeg")
+                    return
+
+                if parsed.path == "/v1/audio/transcriptions":
+                    if server._count("whisper"):
+                        self._fail()
+                        return
+                    self._send_json({
+                        "text": "벤치마크용 대체 전사 결과입니다.",
+                        "language": "korean",
+                        "duration": 3.0,
+                        "segments": [{"id": 0, "start": 0.0, "end": 3.0, "text": "벤치마크용 대체 전사 결과입니다."}],
+                    })
+                    return
+
+                self._send_json({"error": "not found"}, status=404)
+
+        return Handler
@@ -0,0 +1,79 @@
+"""단일 CLI 진입점
+
+    python -m scripts run --new-job          # 전체 파이프라인 (scripts/pipeline.py)
+    python -m scripts generate_images        # 단계 하나만 실행
+    python -m scripts batch jobs.jsonl
+    python -m scripts                        # 명령 목록
+
+명령마다 해당 모듈 하나만 import해 그 모듈의 스크립트 진입점(__main__ 블록)을 그대로 실행한다.
+무거운 의존성(requests, Pillow, NumPy, PyYAML)은 실제로 쓰는 함수 안에서 import하므로,
+명령이 필요로 하지 않는 라이브러리는 로드되지 않는다. 시작 시간은 benchmarks/bench_startup.py로 측정한다.
+"""
+import importlib.util
+import sys
+import types
+
+# 명령 → (모듈, 설명). 단계 이름은 pipeline.py의 단계 이름과 같다.
+COMMANDS = {
+    "run": ("scripts.pipeline", "전체 파이프라인 실행 (--job-id, --new-job, --force)"),
+    "generate_prompt": ("scripts.generate_prompt", "주제/스크립트/이미지 프롬프트 선택"),
+    "generate_images": ("scripts.generate_image", "이미지 확보 (캐시 → Unsplash → 타이틀 카드)"),
+    "generate_audio": ("scripts.generate_audio", "음성 합성"),
+    "plan_timeline": ("scripts.timeline", "슬라이드/자막 타임라인 계획"),
+    "create_video": ("scripts.create_video", "슬라이드쇼 영상 생성"),
+    "generate_subtitle": ("scripts.generate_subtitle", "자막 생성"),
+    "edit_video": ("scripts.edit_video", "최종 편집"),
+    "batch": ("scripts.batch", "여러 숏츠 배치 렌더링"),
+    "workspace": ("scripts.workspace", "작업 공간 목록/정리"),
+    "topics": ("scripts.topic_catalog", "주제 카탈로그 색인/검색"),
+    "title_cards": ("scripts.title_card", "타이틀 카드 일괄 렌더링"),
+}
+
+
+def print_usage():
+    print("사용법: python -m scripts <명령> [인자...]\n")
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:<18} {description}")
+
+
+def run_as_main(module, argv):
+    """모듈을 __main__으로 실행 (python -m <모듈>과 같되 sys.argv[0]은 CLI 명령 이름)
+
+    runpy.run_module(alter_sys=True)는 sys.argv[0]을 모듈 파일 경로로 바꿔 argparse 사용법에 pipeline.py 등이
+    표시되므로 직접 실행한다. 실행하는 동안 sys.modules["__main__"]을 그 모듈로 바꿔 두어야
+    배치 렌더링의 프로세스 풀이 __main__의 함수를 pickle로 워커에 넘길 수 있다.
+    """
+    spec = importlib.util.find_spec(module)
+    main_module = types.ModuleType("__main__")
+    main_module.__file__ = spec.origin
+    main_module.__spec__ = spec
+    main_module.__loader__ = spec.loader
+    main_module.__package__ = spec.parent
+    code = spec.loader.get_code(module)
+
+    saved_main, saved_argv = sys.modules["__main__"], sys.argv
+    sys.modules["__main__"] = main_module
+    sys.argv = argv
+    try:
+        exec(code, main_module.__dict__)
+    finally:
+        sys.modules["__main__"], sys.argv = saved_main, saved_argv
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"❌ 알 수 없는 명령: {argv[0]}\n")
+        print_usage()
+        return 2
+
+    module = COMMANDS[argv[0]][0]
+    run_as_main(module, [f"python -m scripts {argv[0]}"] + argv[1:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""콘텐츠 주소 기반 디스크 캐시 (용량 제한 + LRU 정리)
+
+키(프롬프트, 크기, 소스 등)는 index.json에 기록하고, 실제 파일은 내용 해시 이름으로
+blobs/ 아래에 한 번만 저장한다. 같은 내용을 가리키는 키가 여러 개여도 파일은 하나다.
+적중 시의 마지막 사용 시각은 메모리에만 기록하고, 다음 저장(put/정리) 때나 프로세스 종료 시 인덱스에 반영한다.
+"""
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from scripts.utils import load_config, get_env_var
+
+DEFAULT_CACHE_DIR = ".cache/autovideo"
+DEFAULT_MAX_MB = 500
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """파일 내용의 sha256 해시"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetCache:
+    """하나의 네임스페이스(images, tts 등)에 대한 캐시"""
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._removed = set()  # 다음 저장 때 디스크 인덱스에서 되살리지 않을 키
+        self._touched = False  # 저장하지 않은 last_access 갱신이 있는지
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._index = self._load_index()
+
+    @staticmethod
+    def make_key(**parts):
+        """키 구성 요소를 정렬된 JSON으로 직렬화해 해시"""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️ 캐시 인덱스 손상, 초기화: {self.index_path}")
+        return {}
+
+    def _save_index(self):
+        """인덱스 저장. 같은 캐시를 쓰는 다른 프로세스(동시 작업)가 추가한 항목은 합쳐서 보존한다."""
+        with self._process_lock():
+            if self.index_path.exists():
+                try:
+                    with open(self.index_path, "r", encoding="utf-8") as f:
+                        on_disk = json.load(f)
+                except (OSError, ValueError):
+                    on_disk = {}
+                for key, entry in on_disk.items():
+                    ours = self._index.get(key)
+                    if ours is None:
+                        if key not in self._removed and (self.blob_dir / entry["blob"]).exists():
+                            self._index[key] = entry
+                    elif ours["blob"] == entry["blob"]:
+                        # 다른 프로세스가 기록한 더 최근 사용 시각은 유지
+                        ours["last_access"] = max(ours["last_access"], entry.get("last_access", 0))
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+            self._removed.clear()
+            self._touched = False
+
+    def flush(self):
+        """저장하지 않은 last_access 갱신을 인덱스에 반영"""
+        with self._lock:
+            if self._touched:
+                self._save_index()
+
+    @contextmanager
+    def _process_lock(self):
+        """프로세스 간 인덱스 갱신 잠금 (fcntl이 없는 플랫폼에서는 프로세스 내 잠금만 사용)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_entry(self, key):
+        """캐시 항목 조회 (없으면 None). 반환 dict에는 path와 meta가 들어 있다."""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                blob_path = self.blob_dir / entry["blob"]
+                if blob_path.exists():
+                    # 적중은 메모리에만 기록 (인덱스 파일 쓰기/프로세스 잠금 없음)
+                    entry["last_access"] = time.time()
+                    self._touched = True
+                    self.hits += 1
+                    return {"path": blob_path, "meta": entry.get("meta", {})}
+                # 파일이 지워졌으면 항목도 제거
+                del self._index[key]
+                self._removed.add(key)
+                self._save_index()
+            self.misses += 1
+            return None
+
+    def get(self, key):
+        """캐시된 파일 경로 조회 (없으면 None)"""
+        entry = self.get_entry(key)
+        return entry["path"] if entry else None
+
+    def put_file(self, key, src_path, meta=None):
+        """파일을 캐시에 저장하고 캐시 내 경로 반환"""
+        src_path = Path(src_path)
+        blob_name = hash_file(src_path) + src_path.suffix
+        blob_path = self.blob_dir / blob_name
+
+        with self._lock:
+            if not blob_path.exists():
+                fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+                os.close(fd)
+                shutil.copyfile(src_path, tmp_path)
+                os.replace(tmp_path, blob_path)
+
+            self._index[key] = {
+                "blob": blob_name,
+                "size": blob_path.stat().st_size,
+                "last_access": time.time(),
+                "meta": meta or {},
+            }
+            self._evict(keep=key)
+            self._save_index()
+        return blob_path
+
+    def put_bytes(self, key, data, suffix="", meta=None):
+        """바이트 데이터를 캐시에 저장하고 캐시 내 경로 반환"""
+        blob_name = hashlib.sha256(data).hexdigest() + suffix
+        blob_path = self.blob_dir / blob_name
+
+        with self._lock:
+            if not blob_path.exists():
+                fd, tmp_path = tempfile.mkstemp(dir=self.blob_dir, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, blob_path)
+
+            self._index[key] = {
+                "blob": blob_name,
+                "size": len(data),
+                "last_access": time.time(),
+                "meta": meta or {},
+            }
+            self._evict(keep=key)
+            self._save_index()
+        return blob_path
+
+    def total_bytes(self):
+        """캐시가 차지하는 전체 용량 (공유 blob은 한 번만 계산)"""
+        with self._lock:
+            blobs = {entry["blob"]: entry["size"] for entry in self._index.values()}
+            return sum(blobs.values())
+
+    def _evict(self, keep=None):
+        """용량 초과 시 가장 오래 사용하지 않은 항목부터 제거 (keep 키는 유지)"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            del self._index[key]
+            self._removed.add(key)
+            # 같은 blob을 참조하는 다른 키가 없을 때만 파일 삭제
+            if not any(other["blob"] == entry["blob"] for other in self._index.values()):
+                blob_path = self.blob_dir / entry["blob"]
+                if blob_path.exists():
+                    blob_path.unlink()
+                total -= entry["size"]
+
+    def stats(self):
+        """적중/미스 횟수와 용량 정보"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": self.total_bytes(),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def get_cache_dir():
+    """캐시 루트 디렉토리 (환경 변수 AUTOVIDEO_CACHE_DIR > config.yaml > 기본값)"""
+    cache_config = (load_config() or {}).get("cache", {}) or {}
+    return Path(get_env_var("AUTOVIDEO_CACHE_DIR", "") or cache_config.get("dir", DEFAULT_CACHE_DIR))
+
+
+def get_cache(namespace):
+    """네임스페이스별 캐시 인스턴스 반환 (프로세스 내 공유)
+
+    용량 제한은 config.yaml의 cache.<namespace>_max_mb 값을 사용한다.
+    """
+    with _caches_lock:
+        if namespace not in _caches:
+            cache_config = (load_config() or {}).get("cache", {}) or {}
+            max_mb = cache_config.get(f"{namespace}_max_mb", DEFAULT_MAX_MB)
+            _caches[namespace] = AssetCache(get_cache_dir() / namespace, int(max_mb * 1024 * 1024))
+        return _caches[namespace]
+
+
+@atexit.register
+def flush_caches():
+    """프로세스 종료 시 모든 캐시의 last_access 갱신을 저장"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        try:
+            cache.flush()
+        except OSError as e:
+            print(f"⚠️ 캐시 인덱스 저장 실패: {cache.index_path} ({e})")
@@ -0,0 +1,270 @@
+"""여러 숏츠를 한 번에 렌더링하는 배치 실행기
+
+JSONL 작업 목록(주제, 스크립트, 이미지 프롬프트, 음성)을 읽어 한꺼번에 계획을 세우고,
+작업 간에 겹치는 이미지/음성은 한 번만 확보한 뒤 프로세스 풀에서 영상을 렌더링한다.
+
+작업 파일 예시 (한 줄에 하나):
+    {"id": "tech-01", "topic": "기술 트렌드"}
+    {"topic": "환경 보호", "script": "...", "image_prompts": ["...", "..."], "voice": "21m00Tcm4TlvDq8ikWAM"}
+    {"topic": "자기계발", "profile": "draft", "encoding": {"crf": 30}}
+    {"topic": "여행", "motion_mode": "kenburns", "motion": ["zoom_in", "pan_left"]}
+    {"topic": "요리", "subtitle_mode": "soft"}
+
+사용법:
+    python scripts/batch.py jobs.jsonl --max-ffmpeg 2
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.utils import get_output_dir, load_config, probe_duration, write_json_atomic
+from scripts.asset_cache import get_cache
+from scripts.generate_prompt import select_topic
+from scripts.generate_image import acquire_image, DEFAULT_MAX_CONCURRENCY
+from scripts.generate_audio import synthesize_speech, normalize_tts_text, ELEVENLABS_VOICE_ID
+from scripts.generate_subtitle import generate_subtitle_from_script
+from scripts.create_video import collect_valid_images
+from scripts.timeline import build_timeline
+from scripts.edit_video import render_single_pass
+from scripts.encoding import resolve_profile
+from scripts.renditions import resolve_renditions, poster_settings, rendition_paths
+from scripts.workspace import validate_job_id
+from scripts.motion import motion_settings
+from scripts.subtitles import resolve_subtitle_mode
+from scripts.tracing import span, start_trace, end_trace, current_span
+
+# 동시에 실행할 FFmpeg 프로세스 수 기본값 (config.yaml의 batch.max_ffmpeg_processes로 변경)
+DEFAULT_MAX_FFMPEG = 2
+
+# 작업 전체가 공유하는 에셋 디렉토리 (batch_dir 아래, 작업 id와 겹치면 안 됨)
+ASSETS_DIR_NAME = "assets"
+
+
+def _asset_id(*parts):
+    """에셋 파일 이름에 쓸 짧은 해시"""
+    raw = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def load_jobs(jobs_path):
+    """JSONL 작업 목록을 읽고 비어 있는 필드는 generate_prompt 템플릿으로 채움"""
+    jobs = []
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{jobs_path}:{line_no}: 잘못된 JSON ({e})")
+
+            job_id = str(spec.get("id") or f"job_{len(jobs) + 1:03d}")
+            try:
+                validate_job_id(job_id)
+            except ValueError as e:
+                raise ValueError(f"{jobs_path}:{line_no}: {e}")
+            if job_id == ASSETS_DIR_NAME:
+                raise ValueError(f"{jobs_path}:{line_no}: 작업 id로 쓸 수 없는 이름: {job_id!r} (공유 에셋 디렉토리)")
+
+            template = select_topic(spec.get("topic", ""))
+            jobs.append({
+                "id": job_id,
+                "topic": template["topic"] if not spec.get("script") else spec.get("topic", ""),
+                "script": normalize_tts_text(spec.get("script") or template["script"]),
+                "image_prompts": spec.get("image_prompts") or template["image_prompts"][:3],
+                "voice": spec.get("voice") or ELEVENLABS_VOICE_ID,
+                "profile": spec.get("profile"),
+                "encoding": spec.get("encoding") or {},
+                "motion_mode": spec.get("motion_mode"),
+                "motion": spec.get("motion"),
+                "subtitle_mode": spec.get("subtitle_mode"),
+                "renditions": spec.get("renditions"),
+                "poster": spec.get("poster"),
+            })
+
+    ids = [job["id"] for job in jobs]
+    duplicates = sorted({job_id for job_id in ids if ids.count(job_id) > 1})
+    if duplicates:
+        raise ValueError(f"중복된 작업 id: {duplicates}")
+    return jobs
+
+
+def plan_assets(jobs, assets_dir):
+    """작업 전체에서 고유한 이미지 프롬프트와 (스크립트, 음성) 조합을 모음
+
+    같은 에셋은 assets_dir 아래 하나의 파일로 공유되며, 각 작업에는 그 경로만 연결한다.
+    """
+    images = {}
+    audio = {}
+    for job in jobs:
+        job["image_files"] = []
+        for prompt in job["image_prompts"]:
+            path = assets_dir / f"image_{_asset_id(prompt)}.jpg"
+            images[prompt] = path
+            job["image_files"].append(str(path))
+
+        audio_key = (job["script"], job["voice"])
+        path = assets_dir / f"audio_{_asset_id(*audio_key)}.mp3"
+        audio[audio_key] = path
+        job["audio_file"] = str(path)
+
+    return {"images": images, "audio": audio}
+
+
+def acquire_assets(plan, max_workers=DEFAULT_MAX_CONCURRENCY):
+    """계획된 고유 에셋을 한 번씩만 확보 (이미지/음성 동시 진행)
+
+    반환값: 음성 파일 경로별 문장 길이 목록 (알 수 없으면 None)
+    """
+    cache = get_cache("images")
+    parent = current_span()
+
+    def fetch_image(item):
+        prompt, path = item
+        if path.exists() and path.stat().st_size > 0:
+            return
+        if not acquire_image(prompt, path, cache, parent=parent):
+            print(f"  ❌ 이미지 확보 실패: {prompt[:50]}")
+
+    sentence_durations = {}
+
+    def fetch_audio(item):
+        (script, voice), path = item
+        with span("audio.acquire", parent=parent, voice=voice):
+            # 문장별 조각은 TTS 캐시에 있으므로 파일이 이미 있어도 다시 호출해 문장별 길이를 얻는다
+            result, _, durations = synthesize_speech(script, path, voice_id=voice)
+        sentence_durations[str(path)] = durations
+        if not result:
+            print(f"  ❌ 음성 생성 실패: {script[:30]}...")
+            # 실패한 백엔드가 남긴 빈/불완전 파일 제거
+            if path.exists():
+                path.unlink()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        image_futures = [executor.submit(fetch_image, item) for item in plan["images"].items()]
+        audio_futures = [executor.submit(fetch_audio, item) for item in plan["audio"].items()]
+        for future in image_futures + audio_futures:
+            future.result()
+    return sentence_durations
+
+
+def render_job(job, job_dir):
+    """작업 하나를 단일 패스로 렌더링 (프로세스 풀 워커에서 실행, 트레이스는 job_dir/trace.jsonl)"""
+    job_dir = Path(job_dir)
+    job_dir.mkdir(parents=True, exist_ok=True)
+    start_trace(job_dir / "trace.jsonl", trace_id=job["id"])
+    try:
+        with span("job.render", job_id=job["id"], images=len(job["image_files"])) as s:
+            result = _render_job(job, job_dir)
+            if not result["ok"]:
+                s.fail(result.get("error", "렌더링 실패"))
+            return result
+    finally:
+        end_trace(print_summary=False)
+
+
+def _render_job(job, job_dir):
+    """render_job 본체"""
+    valid_images = collect_valid_images(job["image_files"])
+    if not valid_images:
+        return {"id": job["id"], "ok": False, "error": "유효한 이미지 없음"}
+
+    profile = resolve_profile(job["profile"], job["encoding"])
+    audio_duration = probe_duration(job["audio_file"]) if Path(job["audio_file"]).exists() else None
+    timeline = build_timeline(job["script"], len(valid_images), profile["fps"], audio_duration=audio_duration,
+                              sentence_durations=job.get("sentence_durations"))
+    duration = timeline["duration"]
+    subtitle_path = generate_subtitle_from_script(job["script"], duration, job_dir / "subtitle.srt", cues=timeline["cues"])
+    renditions = resolve_renditions(job, profile)
+    poster = poster_settings(job, duration)
+    final_path = render_single_pass(
+        valid_images, subtitle_path, job["audio_file"], job_dir / "final_shorts.mp4", profile,
+        timeline["slide_durations"], motion=motion_settings(job), subtitle_mode=resolve_subtitle_mode(job),
+        renditions=renditions, poster=poster
+    )
+    rendition_files, poster_path = rendition_paths(job_dir, renditions, poster)
+
+    result = {
+        "id": job["id"],
+        "topic": job["topic"],
+        "ok": bool(final_path),
+        "final_video_path": final_path,
+        "subtitle_path": subtitle_path,
+        "video_duration": duration,
+        "timeline": timeline,
+        "render_profile": profile["name"],
+        "rendition_paths": rendition_files if final_path else {},
+        "poster_path": poster_path if final_path else None,
+    }
+    write_json_atomic(job_dir / "metadata.json", {**job, **result})
+    return result
+
+
+def _init_render_worker(segment_workers):
+    """렌더링 워커 초기화: segments 엔진의 세그먼트 인코딩 수를 작업별 FFmpeg 예산으로 제한"""
+    os.environ["SEGMENT_MAX_WORKERS"] = str(segment_workers)
+
+
+def run_batch(jobs_path, max_ffmpeg=None, output_dir=None):
+    """배치 실행: 계획 → 고유 에셋 확보 → 프로세스 풀 렌더링"""
+    batch_config = (load_config() or {}).get("batch", {}) or {}
+    max_ffmpeg = max_ffmpeg or batch_config.get("max_ffmpeg_processes", DEFAULT_MAX_FFMPEG)
+    batch_dir = Path(output_dir) if output_dir else get_output_dir() / "batch"
+    assets_dir = batch_dir / ASSETS_DIR_NAME
+    assets_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = load_jobs(jobs_path)
+    if not jobs:
+        print("❌ 작업이 없습니다.")
+        return None
+
+    plan = plan_assets(jobs, assets_dir)
+    total_images = sum(len(job["image_prompts"]) for job in jobs)
+    print(f"📋 {len(jobs)}개 작업: 이미지 {total_images}개 → 고유 {len(plan['images'])}개, "
+          f"음성 {len(jobs)}개 → 고유 {len(plan['audio'])}개")
+
+    start_trace(batch_dir / "trace.jsonl")
+    with span("batch.acquire_assets", images=len(plan["images"]), audio=len(plan["audio"])):
+        sentence_durations = acquire_assets(plan)
+    end_trace()
+    for job in jobs:
+        job["sentence_durations"] = sentence_durations.get(job["audio_file"])
+
+    # 워커 수 × 워커당 세그먼트 인코딩 수가 max_ffmpeg를 넘지 않게 나눔 (작업이 적으면 워커당 몫이 커짐)
+    workers = min(max_ffmpeg, len(jobs))
+    segment_workers = max(1, max_ffmpeg // workers)
+    print(f"🎬 렌더링 시작 (FFmpeg 최대 {max_ffmpeg}개 동시 실행)")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(segment_workers,)) as executor:
+        futures = [executor.submit(render_job, job, batch_dir / job["id"]) for job in jobs]
+        results = [future.result() for future in futures]
+
+    write_json_atomic(batch_dir / "batch_results.json", results)
+
+    succeeded = sum(1 for result in results if result["ok"])
+    print(f"\n🎉 배치 완료: {succeeded}/{len(results)}개 성공")
+    print(f"📁 결과 위치: {batch_dir}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 숏츠를 한 번에 렌더링")
+    parser.add_argument("jobs", help="작업 목록 JSONL 파일")
+    parser.add_argument("--max-ffmpeg", type=int, default=None, help="동시에 실행할 FFmpeg 프로세스 수")
+    parser.add_argument("--output-dir", default=None, help="결과 디렉토리 (기본값: output/batch)")
+    args = parser.parse_args()
+
+    results = run_batch(args.jobs, args.max_ffmpeg, args.output_dir)
+    if not results or not all(result["ok"] for result in results):
+        sys.exit(1)
@@ -1,7 +1,10 @@
 """FFmpeg를 사용한 영상 생성"""
+import shutil
 import subprocess
 import sys
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -10,100 +13,312 @@ project_root = os.path.dirname(script_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from scripts.utils import get_output_dir, load_metadata
+from scripts.utils import get_output_dir, load_metadata, save_metadata, get_env_var
+from scripts.asset_cache import get_cache, hash_file
+from scripts.encoding import resolve_profile, video_codec_args, encoder_key
+from scripts.tracing import span, traced_run, current_span
+from scripts.timeline import slide_durations_for, IMAGE_DURATION
+from scripts.frame_pipe import fit_frame, rawvideo_input_args, slide_frames, pipe_frames
+from scripts.motion import motion_settings, plan_trajectories, motion_frames
 
-# 숏츠 설정
-VIDEO_WIDTH = 1080
-VIDEO_HEIGHT = 1920
-FPS = 30
-IMAGE_DURATION = 3  # 각 이미지당 3초
+# 해상도, fps, 인코더 설정은 인코딩 프로필에서, 슬라이드 길이는 타임라인(timeline.py)에서 가져옴
 
+# 프레임 정규화 방식 (바뀌면 세그먼트 캐시 키도 바뀌도록 버전을 둠)
+NORMALIZE_VERSION = "fit-pad-v1"
 
-def create_video_from_images():
-    """이미지 슬라이드쇼 영상 생성"""
-    metadata = load_metadata()
-    if not metadata:
-        print("❌ 메타데이터를 찾을 수 없습니다.")
-        return
-    
-    image_paths = metadata.get("image_paths", [])
-    if not image_paths:
-        print("❌ 이미지 경로를 찾을 수 없습니다.")
-        return
-    
-    output_dir = get_output_dir()
-    video_path = output_dir / "video_raw.mp4"
-    
-    # 이미지 경로 확인
+# 슬라이드쇼 엔진
+#   filter: 이미지마다 입력 + scale/pad/fps 체인 (이미지 수만큼 디코더/필터가 동시에 살아 있음)
+#   concat: 미리 정규화한 프레임을 concat demuxer로 순차 입력 (이미지 수와 무관하게 메모리 일정)
+#   segments: 슬라이드마다 인코딩한 세그먼트를 캐시하고 스트림 복사로 이어 붙임 (바뀐 슬라이드만 인코딩)
+#   rawpipe: Python에서 만든 프레임을 rawvideo로 FFmpeg stdin에 전달 (fallback 카드는 JPEG 없이 바로 그림)
+SLIDESHOW_ENGINE = get_env_var("SLIDESHOW_ENGINE", "filter")
+
+
+def collect_valid_images(image_paths):
+    """존재하고 비어있지 않은 이미지만 절대 경로로 반환"""
     valid_images = []
-    print(f"[DEBUG] 이미지 경로 검증 시작, 총 {len(image_paths)}개")
     for img_path in image_paths:
         path = Path(img_path)
-        exists = path.exists()
-        size = path.stat().st_size if exists else 0
-        print(f"[DEBUG] 이미지: {img_path}, 존재={exists}, 크기={size}")
-        if exists and size > 0:
+        if path.exists() and path.stat().st_size > 0:
             valid_images.append(str(path.absolute()))
+        else:
+            print(f"  ⚠️ 사용할 수 없는 이미지 제외: {img_path}")
     
-    print(f"[DEBUG] 유효한 이미지 수: {len(valid_images)}")
-    
-    if not valid_images:
-        print("❌ 유효한 이미지가 없습니다.")
-        return
-    
-    print(f"🎬 영상 생성 중... ({len(valid_images)}개 이미지)")
+    return valid_images
+
+
+def build_slideshow_graph(valid_images, profile, durations):
+    """슬라이드쇼 입력 인자와 filter_complex 구성 (출력 라벨: [vout])
     
-    # FFmpeg 명령어 구성 - 더 간단하고 안정적인 방법
+    이미지 입력은 0번부터 순서대로 배치되므로, 호출하는 쪽에서
+    추가 입력(오디오 등)은 len(valid_images)번 인덱스부터 붙이면 된다.
+    """
+    width, height, fps = profile["width"], profile["height"], profile["fps"]
     inputs = []
     filter_parts = []
     
     # 각 이미지를 입력으로 추가하고 크기 조정
-    for i, img_path in enumerate(valid_images):
-        inputs.extend(["-loop", "1", "-t", str(IMAGE_DURATION), "-i", img_path])
+    for i, (img_path, duration) in enumerate(zip(valid_images, durations)):
+        inputs.extend(["-loop", "1", "-t", str(duration), "-i", img_path])
         filter_parts.append(
-            f"[{i}:v]scale={VIDEO_WIDTH}:{VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
-            f"pad={VIDEO_WIDTH}:{VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={FPS}[v{i}]"
+            f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps}[v{i}]"
         )
     
     # 이미지들을 연결
     if len(valid_images) == 1:
-        filter_complex = filter_parts[0].replace("[v0]", "[0:v]").replace("[vout]", "[vout]")
-        if "[vout]" not in filter_complex:
-            filter_complex += "[vout]"
+        filter_complex = filter_parts[0].replace("[v0]", "[vout]")
     else:
         scale_filters = ";".join(filter_parts)
         concat_inputs = "".join([f"[v{i}]" for i in range(len(valid_images))])
         filter_complex = f"{scale_filters};{concat_inputs}concat=n={len(valid_images)}:v=1:a=0[vout]"
     
-    # FFmpeg 명령어 실행
+    return inputs, filter_complex
+
+
+def normalize_frame(image_path, output_path, width, height):
+    """이미지를 비율 유지로 맞춘 뒤 검은 여백을 넣어 width x height 프레임으로 저장"""
+    fit_frame(image_path, width, height).save(output_path, "JPEG", quality=95)
+    return str(output_path)
+
+
+def write_concat_list(frame_paths, durations, list_path):
+    """concat demuxer용 목록 파일 작성 (이미지별 표시 시간 포함)"""
+    lines = ["ffconcat version 1.0"]
+    for frame_path, duration in zip(frame_paths, durations):
+        escaped = str(frame_path).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+        lines.append(f"duration {duration}")
+    # 마지막 항목의 duration이 적용되도록 마지막 파일을 한 번 더 넣음 (concat demuxer 동작 방식)
+    lines.append(lines[-2])
+    
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return str(list_path)
+
+
+def build_concat_graph(valid_images, work_dir, profile, durations):
+    """concat 엔진: 정규화 프레임 + 목록 파일로 입력 1개짜리 그래프 구성 (출력 라벨: [vout])"""
+    # 목록 파일 안의 상대 경로는 목록 파일 위치 기준으로 해석되므로 절대 경로 사용
+    work_dir = Path(work_dir).absolute()
+    frame_paths = [work_dir / f"frame_{i:04d}.jpg" for i in range(1, len(valid_images) + 1)]
+    
+    # 프레임 정규화는 이미지마다 독립적이므로 병렬 처리
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        list(executor.map(
+            lambda image_path, frame_path: normalize_frame(image_path, frame_path, profile["width"], profile["height"]),
+            valid_images, frame_paths
+        ))
+    
+    list_path = write_concat_list(frame_paths, durations, work_dir / "slides.ffconcat")
+    
+    inputs = ["-f", "concat", "-safe", "0", "-i", list_path]
+    filter_complex = (
+        f"[0:v]trim=duration={sum(durations)},setpts=PTS-STARTPTS,fps={profile['fps']},"
+        f"setsar=1,format=yuv420p[vout]"
+    )
+    return inputs, filter_complex
+
+
+def segment_cache_key(cache, image_path, duration, profile):
+    """세그먼트 캐시 키: 이미지 내용 해시 + 길이 + 해상도 + fps + 인코더 설정"""
+    return cache.make_key(
+        image_sha256=hash_file(image_path),
+        duration=duration,
+        width=profile["width"],
+        height=profile["height"],
+        fps=profile["fps"],
+        normalize=NORMALIZE_VERSION,
+        encoder=encoder_key(profile)
+    )
+
+
+def encode_segment(image_path, duration, output_path, work_dir, profile):
+    """슬라이드 하나를 정해진 길이의 세그먼트로 인코딩"""
+    frame_path = Path(work_dir) / f"{Path(output_path).stem}.jpg"
+    normalize_frame(image_path, frame_path, profile["width"], profile["height"])
     cmd = [
         "ffmpeg",
-        "-y",  # 덮어쓰기
-        *inputs,
-        "-filter_complex", filter_complex,
-        "-map", "[vout]",
-        "-c:v", "libx264",
-        "-preset", "medium",
-        "-crf", "23",
-        "-pix_fmt", "yuv420p",
-        str(video_path)
+        "-y",
+        "-loop", "1",
+        "-framerate", str(profile["fps"]),
+        "-t", str(duration),
+        "-i", str(frame_path),
+        "-vf", "setsar=1",
+        *video_codec_args(profile),
+        "-r", str(profile["fps"]),
+        str(output_path)
     ]
+    traced_run(cmd, name="ffmpeg.segment", check=True)
+    return str(output_path)
+
+
+def segment_workers():
+    """segments 엔진이 동시에 실행할 FFmpeg 수
+
+    환경 변수 SEGMENT_MAX_WORKERS(배치 렌더링이 작업별 FFmpeg 예산으로 지정) > 코어 수의 절반
+    (FFmpeg 자체도 멀티스레드이므로).
+    """
+    value = get_env_var("SEGMENT_MAX_WORKERS", "")
+    if value:
+        return max(1, int(value))
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def build_segment_list(valid_images, work_dir, profile, durations):
+    """segments 엔진: 슬라이드별 세그먼트를 캐시에서 찾거나 인코딩한 뒤 concat 목록 작성
+    
+    반환값: concat demuxer 목록 파일 경로. 세그먼트는 work_dir로 복사(가능하면 하드링크)해 두므로
+    인코딩 도중 캐시 정리가 일어나도 안전하다.
+    """
+    work_dir = Path(work_dir).absolute()
+    cache = get_cache("segments")
+    parent = current_span()
+    
+    def acquire_segment(indexed_image):
+        i, (image_path, duration) = indexed_image
+        segment_path = work_dir / f"segment_{i:04d}.mp4"
+        cache_key = segment_cache_key(cache, image_path, duration, profile)
+        with span("segment.acquire", parent=parent, index=i) as s:
+            cached = cache.get(cache_key)
+            s.set(cache_hit=bool(cached))
+            if not cached:
+                encoded = encode_segment(image_path, duration, work_dir / f"encoded_{i:04d}.mp4", work_dir, profile)
+                cached = cache.put_file(cache_key, encoded, meta={"duration": duration})
+        try:
+            os.link(cached, segment_path)
+        except OSError:
+            shutil.copyfile(cached, segment_path)
+        return segment_path
+    
+    # 세그먼트 인코딩은 서로 독립적이므로 병렬 처리
+    max_workers = segment_workers()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        segment_paths = list(executor.map(acquire_segment, enumerate(zip(valid_images, durations), 1)))
+    
+    stats = cache.stats()
+    print(f"📦 세그먼트 캐시: 적중 {stats['hits']} / 미스 {stats['misses']}")
+    
+    lines = ["ffconcat version 1.0"] + [f"file '{path}'" for path in segment_paths]
+    list_path = work_dir / "segments.ffconcat"
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return str(list_path)
+
+
+def prepare_slideshow(valid_images, work_dir, profile, durations=None, engine=None):
+    """선택한 엔진으로 슬라이드쇼 입력/필터 구성 (출력 라벨: [vout])
+    
+    work_dir은 concat 엔진이 정규화 프레임을 쓰는 임시 디렉토리이며, 인코딩이 끝날 때까지 유지해야 한다.
+    durations는 슬라이드별 표시 시간(초)이며, 생략하면 이미지당 IMAGE_DURATION을 사용한다.
+    """
+    engine = engine or SLIDESHOW_ENGINE
+    durations = durations or [IMAGE_DURATION] * len(valid_images)
+    if engine == "concat":
+        return build_concat_graph(valid_images, work_dir, profile, durations)
+    if engine == "segments":
+        list_path = build_segment_list(valid_images, work_dir, profile, durations)
+        return ["-f", "concat", "-safe", "0", "-i", list_path], "[0:v]setsar=1,format=yuv420p[vout]"
+    if engine == "rawpipe":
+        # 프레임은 호출하는 쪽에서 run_slideshow_command()로 stdin에 공급
+        return rawvideo_input_args(profile), "[0:v]setsar=1,format=yuv420p[vout]"
+    return build_slideshow_graph(valid_images, profile, durations)
+
+
+def slideshow_engine(motion=None):
+    """사용할 슬라이드쇼 엔진 (팬/줌 모션은 프레임을 Python에서 만들므로 항상 rawpipe)"""
+    if motion and motion["mode"] != "static":
+        return "rawpipe"
+    return SLIDESHOW_ENGINE
+
+
+def run_slideshow_command(cmd, name, valid_images, profile, durations, title_cards=None, engine=None, motion=None):
+    """prepare_slideshow()의 입력으로 만든 FFmpeg 명령 실행
+
+    rawpipe 엔진이면 슬라이드 프레임(motion 설정이 있으면 팬/줌 프레임)을 stdin으로 공급하고,
+    나머지 엔진은 그대로 실행한다.
+    """
+    if (engine or SLIDESHOW_ENGINE) == "rawpipe":
+        durations = durations or [IMAGE_DURATION] * len(valid_images)
+        if motion and motion["mode"] == "kenburns":
+            trajectories = plan_trajectories(len(valid_images), motion["trajectories"], motion["seed"])
+            frames = motion_frames(valid_images, profile, durations, trajectories, motion["max_zoom"], title_cards)
+        else:
+            frames = slide_frames(valid_images, profile, durations, title_cards)
+        return pipe_frames(cmd, frames, name=name)
+    return traced_run(cmd, name=name, check=True)
+
+
+def create_video_from_images(metadata=None):
+    """이미지 슬라이드쇼 영상 생성"""
+    standalone = metadata is None
+    if standalone:
+        metadata = load_metadata()
+    if not metadata:
+        print("❌ 메타데이터를 찾을 수 없습니다.")
+        return
+    
+    image_paths = metadata.get("image_paths", [])
+    if not image_paths:
+        print("❌ 이미지 경로를 찾을 수 없습니다.")
+        return
+    
+    output_dir = get_output_dir()
+    video_path = output_dir / "video_raw.mp4"
+    
+    valid_images = collect_valid_images(image_paths)
+    
+    if not valid_images:
+        print("❌ 유효한 이미지가 없습니다.")
+        return
+    
+    profile = resolve_profile(metadata.get("encoding_profile"), metadata.get("encoding"))
+    durations = slide_durations_for(metadata, len(valid_images), profile["fps"])
+    motion = motion_settings(metadata)
+    engine = slideshow_engine(motion)
+    print(f"🎬 영상 생성 중... ({len(valid_images)}개 이미지, {engine} 엔진, {motion['mode']} 모션, {profile['name']} 프로필)")
     
     try:
-        print("  FFmpeg 실행 중...")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        with tempfile.TemporaryDirectory(dir=output_dir) as work_dir:
+            if engine == "segments":
+                # 캐시된 세그먼트를 재인코딩 없이 스트림 복사로 연결
+                list_path = build_segment_list(valid_images, work_dir, profile, durations)
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy",
+                    str(video_path)
+                ]
+            else:
+                inputs, filter_complex = prepare_slideshow(valid_images, work_dir, profile, durations, engine=engine)
+                
+                # FFmpeg 명령어 실행
+                cmd = [
+                    "ffmpeg",
+                    "-y",  # 덮어쓰기
+                    *inputs,
+                    "-filter_complex", filter_complex,
+                    "-map", "[vout]",
+                    *video_codec_args(profile),
+                    str(video_path)
+                ]
+            
+            print("  FFmpeg 실행 중...")
+            run_slideshow_command(
+                cmd, "ffmpeg.slideshow", valid_images, profile, durations, metadata.get("title_cards"),
+                engine=engine, motion=motion
+            )
         print(f"✅ 영상 생성 완료: {video_path}")
         
         # 메타데이터 업데이트
         metadata["video_path"] = str(video_path)
-        metadata["video_duration"] = len(valid_images) * IMAGE_DURATION
-        from scripts.utils import save_metadata
-        save_metadata(metadata)
+        metadata["video_duration"] = round(sum(durations), 3)
+        metadata["render_profile"] = profile["name"]
+        if current_span():
+            current_span().set(images=len(valid_images), engine=engine, motion=motion["mode"], bytes=video_path.stat().st_size)
+        if standalone:
+            save_metadata(metadata)
         
         return str(video_path)
     except subprocess.CalledProcessError as e:
@@ -2,6 +2,7 @@
 import subprocess
 import sys
 import os
+import tempfile
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -10,43 +11,70 @@ project_root = os.path.dirname(script_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from scripts.utils import get_output_dir, load_metadata
+from scripts.utils import get_output_dir, load_metadata, save_metadata, get_env_var
+from scripts.create_video import collect_valid_images, prepare_slideshow, run_slideshow_command, slideshow_engine
+from scripts.timeline import slide_durations_for
+from scripts.motion import motion_settings
+from scripts.subtitles import resolve_subtitle_mode, burn_filter, build_overlay_graph, soft_subtitle_args
+from scripts.encoding import resolve_profile, video_codec_args, audio_codec_args
+from scripts.renditions import (resolve_renditions, poster_settings, rendition_paths, build_rendition_graph,
+                                rendition_output_args, poster_output_args)
+from scripts.tracing import traced_run
 
-VIDEO_WIDTH = 1080
-VIDEO_HEIGHT = 1920
+# 렌더링 모드: two_pass (create_video → 자막 → 음성) 또는 single_pass (한 번의 인코딩)
+RENDER_MODE = get_env_var("RENDER_MODE", "two_pass")
 
-
-def add_subtitle_to_video(video_path, subtitle_path, output_path):
-    """영상에 자막 추가"""
+def add_subtitle_to_video(video_path, subtitle_path, output_path, profile, mode="burn"):
+    """영상에 자막 추가 (mode: burn / overlay / soft, scripts/subtitles.py 참고)"""
     if not Path(subtitle_path).exists():
         print("⚠️ 자막 파일이 없습니다. 자막 없이 진행합니다.")
         return video_path
     
-    # 자막 스타일 설정
-    subtitle_style = (
-        "FontName=Malgun Gothic,"
-        "FontSize=24,"
-        "PrimaryColour=&Hffffff,"
-        "OutlineColour=&H000000,"
-        "Outline=2,"
-        "Shadow=1,"
-        "Alignment=2,"  # 하단 중앙
-        "MarginV=100"
-    )
-    
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-i", video_path,
-        "-vf", f"subtitles={subtitle_path}:force_style='{subtitle_style}'",
-        "-c:v", "libx264",
-        "-c:a", "copy",
-        str(output_path)
-    ]
-    
     try:
-        subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print(f"✅ 자막 추가 완료: {output_path}")
+        with tempfile.TemporaryDirectory(dir=Path(output_path).parent) as work_dir:
+            if mode == "soft":
+                # 재인코딩 없이 자막 트랙만 추가
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    "-i", video_path,
+                    "-i", str(subtitle_path),
+                    "-map", "0",
+                    "-c", "copy",
+                    *soft_subtitle_args(1),
+                    str(output_path)
+                ]
+            elif mode == "overlay":
+                overlay_inputs, overlay_filter, video_label = build_overlay_graph(
+                    subtitle_path, "[0:v]", 1, profile, work_dir
+                )
+                if not overlay_inputs:
+                    return video_path
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    "-i", video_path,
+                    *overlay_inputs,
+                    "-filter_complex", overlay_filter.lstrip(";"),
+                    "-map", video_label,
+                    "-map", "0:a?",
+                    *video_codec_args(profile),
+                    "-c:a", "copy",
+                    str(output_path)
+                ]
+            else:
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    "-i", video_path,
+                    "-vf", burn_filter(subtitle_path),
+                    *video_codec_args(profile),
+                    "-c:a", "copy",
+                    str(output_path)
+                ]
+            
+            traced_run(cmd, name=f"ffmpeg.subtitle_{mode}", check=True)
+        print(f"✅ 자막 추가 완료 ({mode}): {output_path}")
         return str(output_path)
     except subprocess.CalledProcessError as e:
         print(f"⚠️ 자막 추가 실패: {e.stderr}")
@@ -56,7 +84,7 @@ def add_subtitle_to_video(video_path, subtitle_path, output_path):
         return video_path
 
 
-def add_audio_to_video(video_path, audio_path, output_path):
+def add_audio_to_video(video_path, audio_path, output_path, profile):
     """영상에 음성 추가"""
     if not Path(audio_path).exists():
         print("⚠️ 오디오 파일이 없습니다. 음성 없이 진행합니다.")
@@ -69,16 +97,17 @@ def add_audio_to_video(video_path, audio_path, output_path):
         "-i", video_path,
         "-i", audio_path,
         "-c:v", "copy",
-        "-c:a", "aac",
-        "-b:a", "192k",
-        "-shortest",  # 짧은 쪽에 맞춤
+        "-c:s", "copy",  # soft 자막 트랙이 있으면 그대로 유지
+        *audio_codec_args(profile),
+        "-shortest",  # 타임라인으로 길이를 맞춰 두었으므로 프레임 경계 오차만 정리
         "-map", "0:v:0",
         "-map", "1:a:0",
+        "-map", "0:s?",
         str(output_path)
     ]
     
     try:
-        subprocess.run(cmd, capture_output=True, text=True, check=True)
+        traced_run(cmd, name="ffmpeg.mux_audio", check=True)
         print(f"✅ 음성 추가 완료: {output_path}")
         return str(output_path)
     except subprocess.CalledProcessError as e:
@@ -89,13 +118,166 @@ def add_audio_to_video(video_path, audio_path, output_path):
         return video_path
 
 
-def edit_video():
+def render_single_pass(valid_images, subtitle_path, audio_path, output_path, profile, durations=None, title_cards=None,
+                       motion=None, subtitle_mode="burn", renditions=(), poster=None):
+    """슬라이드쇼 + 자막 + 음성을 하나의 필터 그래프로 한 번에 인코딩
+    
+    video_raw.mp4, video_with_subtitle.mp4 같은 중간 파일 없이
+    final_shorts.mp4를 바로 생성한다 (libx264 인코딩 1회).
+    valid_images는 collect_valid_images()로 검증된 경로 목록이어야 하고,
+    durations는 타임라인에서 정한 슬라이드별 표시 시간이고,
+    title_cards({이미지 경로: 텍스트})는 rawpipe 엔진에서 파일 대신 바로 그릴 fallback 카드,
+    motion은 motion_settings()의 팬/줌 설정, subtitle_mode는 burn / overlay / soft다.
+    renditions(resolve_renditions())와 poster(poster_settings())를 주면 최종 필터 그래프 출력을 split해
+    같은 실행에서 추가 렌디션과 poster.jpg도 output_path와 같은 디렉토리에 만든다 (디코드/합성 1회).
+    """
+    engine = slideshow_engine(motion)
+    has_subtitle = bool(subtitle_path) and Path(subtitle_path).exists()
+    if not has_subtitle:
+        print("⚠️ 자막 파일이 없습니다. 자막 없이 진행합니다.")
+    
+    has_audio = bool(audio_path) and Path(audio_path).exists()
+    if not has_audio:
+        print("⚠️ 오디오 파일이 없습니다. 음성 없이 진행합니다.")
+    
+    try:
+        with tempfile.TemporaryDirectory(dir=Path(output_path).parent) as work_dir:
+            inputs, filter_complex = prepare_slideshow(valid_images, work_dir, profile, durations, engine=engine)
+            video_label = "[vout]"
+            
+            # 자막 (입력이 필요한 모드는 슬라이드쇼 입력 뒤에 추가)
+            subtitle_args = []
+            if has_subtitle and subtitle_mode == "overlay":
+                overlay_inputs, overlay_filter, video_label = build_overlay_graph(
+                    subtitle_path, video_label, inputs.count("-i"), profile, work_dir
+                )
+                inputs.extend(overlay_inputs)
+                filter_complex += overlay_filter
+            elif has_subtitle and subtitle_mode == "soft":
+                subtitle_args = soft_subtitle_args(inputs.count("-i"))
+                inputs.extend(["-i", str(subtitle_path)])
+            elif has_subtitle:
+                filter_complex += f";[vout]{burn_filter(subtitle_path)}[vsub]"
+                video_label = "[vsub]"
+            
+            # 음성 매핑 (슬라이드쇼 입력 뒤에 오디오 입력 추가)
+            audio_args = []
+            audio_map = None
+            if has_audio:
+                audio_index = inputs.count("-i")
+                inputs.extend(["-i", str(audio_path)])
+                audio_map = f"{audio_index}:a:0"
+                audio_args = [
+                    "-map", audio_map,
+                    *audio_codec_args(profile),
+                    "-shortest",  # 타임라인으로 길이를 맞춰 두었으므로 프레임 경계 오차만 정리
+                ]
+            
+            # 추가 렌디션/포스터 (출력별 인코더 인자, 마스터를 마지막 출력으로 둬서 트레이스에 마스터 크기가 남게 함)
+            rendition_filter, video_label, rendition_outputs, poster_label = build_rendition_graph(
+                video_label, profile, renditions, poster
+            )
+            filter_complex += rendition_filter
+            extra_outputs = []
+            for label, rendition in rendition_outputs:
+                extra_outputs += rendition_output_args(label, rendition, Path(output_path).parent, audio_map, subtitle_args)
+            if poster_label:
+                extra_outputs += poster_output_args(poster_label, Path(output_path).parent)
+            
+            cmd = [
+                "ffmpeg",
+                "-y",
+                *inputs,
+                "-filter_complex", filter_complex,
+                *extra_outputs,
+                "-map", video_label,
+                *audio_args,
+                *subtitle_args,
+                *video_codec_args(profile),
+                str(output_path)
+            ]
+            
+            outputs = 1 + len(rendition_outputs) + (1 if poster_label else 0)
+            print(f"🎬 단일 패스 렌더링 중... ({len(valid_images)}개 이미지, {profile['name']} 프로필, 자막 {subtitle_mode}, "
+                  f"출력 {outputs}개)")
+            run_slideshow_command(
+                cmd, "ffmpeg.single_pass", valid_images, profile, durations, title_cards,
+                engine=engine, motion=motion
+            )
+        print(f"✅ 단일 패스 렌더링 완료: {output_path}")
+        return str(output_path)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ FFmpeg 오류: {e.stderr}")
+        return None
+    except FileNotFoundError:
+        print("❌ FFmpeg가 설치되어 있지 않습니다.")
+        return None
+
+
+def encode_renditions(video_path, output_dir, profile, renditions, poster):
+    """완성된 영상을 한 번 디코드해 추가 렌디션과 포스터를 함께 인코딩 (two_pass 모드)"""
+    if not renditions and not poster:
+        return True
+    
+    # 마스터는 이미 만들어졌으므로 렌디션/포스터로만 나눈다
+    rendition_filter, _, rendition_outputs, poster_label = build_rendition_graph(
+        "[0:v]", profile, renditions, poster, include_master=False
+    )
+    outputs = []
+    if poster_label:
+        outputs += poster_output_args(poster_label, output_dir)
+    for label, rendition in rendition_outputs:
+        outputs += rendition_output_args(label, rendition, output_dir, "0:a:0?", ["-map", "0:s?", "-c:s", "copy"])
+    
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i", str(video_path),
+        "-filter_complex", rendition_filter.lstrip(";"),
+        *outputs
+    ]
+    
+    try:
+        traced_run(cmd, name="ffmpeg.renditions", check=True)
+        print(f"✅ 렌디션 {len(renditions)}개{' + 포스터' if poster else ''} 생성 완료")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️ 렌디션 생성 실패: {e.stderr}")
+        return False
+    except FileNotFoundError:
+        print("❌ FFmpeg가 설치되어 있지 않습니다.")
+        return False
+
+
+def record_renditions(metadata, output_dir, renditions, poster):
+    """렌디션/포스터 경로를 메타데이터에 기록"""
+    paths, poster_path = rendition_paths(output_dir, renditions, poster)
+    metadata["rendition_paths"] = paths
+    metadata["poster_path"] = poster_path
+    for name, path in paths.items():
+        print(f"📁 {name}: {path}")
+    if poster_path:
+        print(f"🖼️ 포스터: {poster_path}")
+
+
+def edit_video(metadata=None):
     """최종 영상 편집"""
-    metadata = load_metadata()
+    standalone = metadata is None
+    if standalone:
+        metadata = load_metadata()
     if not metadata:
         print("❌ 메타데이터를 찾을 수 없습니다.")
         return
     
+    # create_video와 같은 프로필을 사용해야 해상도/fps가 일치함
+    profile = resolve_profile(metadata.get("encoding_profile"), metadata.get("encoding"))
+    
+    if RENDER_MODE == "single_pass":
+        final_path = edit_video_single_pass(metadata, profile)
+        if final_path and standalone:
+            save_metadata(metadata)
+        return final_path
+    
     video_path = metadata.get("video_path", "")
     subtitle_path = metadata.get("subtitle_path", "")
     audio_path = metadata.get("audio_path", "")
@@ -109,23 +291,76 @@ def edit_video():
     # 1단계: 자막 추가
     video_with_subtitle = output_dir / "video_with_subtitle.mp4"
     if subtitle_path:
-        current_video = add_subtitle_to_video(video_path, subtitle_path, video_with_subtitle)
+        current_video = add_subtitle_to_video(
+            video_path, subtitle_path, video_with_subtitle, profile, resolve_subtitle_mode(metadata)
+        )
     else:
         current_video = video_path
     
     # 2단계: 음성 추가
     final_video = output_dir / "final_shorts.mp4"
     if audio_path:
-        final_path = add_audio_to_video(current_video, audio_path, final_video)
+        final_path = add_audio_to_video(current_video, audio_path, final_video, profile)
     else:
         # 음성이 없으면 자막만 있는 영상을 복사
         import shutil
         shutil.copy(current_video, final_video)
         final_path = str(final_video)
     
+    # 3단계: 추가 렌디션과 포스터 (완성본을 한 번 디코드)
+    renditions = resolve_renditions(metadata, profile)
+    poster = poster_settings(metadata, metadata.get("video_duration"))
+    if encode_renditions(final_path, output_dir, profile, renditions, poster):
+        record_renditions(metadata, output_dir, renditions, poster)
+    
+    # 메타데이터 업데이트
+    metadata["final_video_path"] = final_path
+    if standalone:
+        save_metadata(metadata)
+    
+    print(f"\n🎉 최종 영상 생성 완료!")
+    print(f"📁 파일 위치: {final_path}")
+    
+    return final_path
+
+
+def edit_video_single_pass(metadata, profile):
+    """단일 패스 모드: 이미지에서 최종 영상까지 한 번에 렌더링"""
+    image_paths = metadata.get("image_paths", [])
+    if not image_paths:
+        print("❌ 이미지 경로를 찾을 수 없습니다.")
+        return
+    
+    valid_images = collect_valid_images(image_paths)
+    if not valid_images:
+        print("❌ 유효한 이미지가 없습니다.")
+        return
+    
+    final_video = get_output_dir() / "final_shorts.mp4"
+    durations = slide_durations_for(metadata, len(valid_images), profile["fps"])
+    renditions = resolve_renditions(metadata, profile)
+    poster = poster_settings(metadata, sum(durations))
+    final_path = render_single_pass(
+        valid_images,
+        metadata.get("subtitle_path", ""),
+        metadata.get("audio_path", ""),
+        final_video,
+        profile,
+        durations,
+        metadata.get("title_cards"),
+        motion_settings(metadata),
+        resolve_subtitle_mode(metadata),
+        renditions,
+        poster
+    )
+    if not final_path:
+        return
+    
     # 메타데이터 업데이트
+    metadata["video_duration"] = round(sum(durations), 3)
+    metadata["render_profile"] = profile["name"]
     metadata["final_video_path"] = final_path
-    save_metadata(metadata)
+    record_renditions(metadata, final_video.parent, renditions, poster)
     
     print(f"\n🎉 최종 영상 생성 완료!")
     print(f"📁 파일 위치: {final_path}")
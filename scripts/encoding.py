@@ -0,0 +1,84 @@
+"""인코딩 프로필 (draft / standard / archive)
+
+config.yaml의 video 섹션을 기본값으로 두고, profiles.<이름>의 값으로 덮어쓴 뒤
+작업별 overrides를 마지막으로 적용한다. 모든 FFmpeg 호출은 여기서 만든 프로필을 사용한다.
+"""
+from scripts.utils import load_config, get_env_var
+
+DEFAULT_PROFILE = "standard"
+
+# config.yaml에 profiles 섹션이 없을 때 사용하는 기본값
+BUILTIN_PROFILES = {
+    "draft": {
+        "width": 540,
+        "height": 960,
+        "fps": 15,
+        "preset": "ultrafast",
+        "crf": 35,
+        "audio_bitrate": "96k",
+    },
+    "standard": {
+        "preset": "medium",
+        "crf": 23,
+        "audio_bitrate": "192k",
+    },
+    "archive": {
+        "preset": "slow",
+        "crf": 18,
+        "audio_bitrate": "256k",
+    },
+}
+
+BASE_SETTINGS = {
+    "width": 1080,
+    "height": 1920,
+    "fps": 30,
+    "codec": "libx264",
+    "preset": "medium",
+    "crf": 23,
+    "pix_fmt": "yuv420p",
+    "audio_codec": "aac",
+    "audio_bitrate": "192k",
+}
+
+
+def resolve_profile(name=None, overrides=None):
+    """프로필 이름과 작업별 overrides로 최종 인코딩 설정 dict 생성
+
+    이름 우선순위: 인자 > 환경 변수 ENCODING_PROFILE > config.yaml output.profile > standard
+    """
+    config = load_config() or {}
+    name = name or get_env_var("ENCODING_PROFILE", "") or (config.get("output") or {}).get("profile") or DEFAULT_PROFILE
+
+    profiles = dict(BUILTIN_PROFILES)
+    profiles.update(config.get("profiles") or {})
+    if name not in profiles:
+        raise ValueError(f"알 수 없는 인코딩 프로필: {name} (사용 가능: {', '.join(sorted(profiles))})")
+
+    video_config = config.get("video") or {}
+    profile = dict(BASE_SETTINGS)
+    profile.update({key: video_config[key] for key in ("width", "height", "fps") if key in video_config})
+    profile.update(profiles[name] or {})
+    profile.update(overrides or {})
+    profile["name"] = name
+    return profile
+
+
+def video_codec_args(profile):
+    """프로필의 비디오 인코더 인자"""
+    return [
+        "-c:v", profile["codec"],
+        "-preset", profile["preset"],
+        "-crf", str(profile["crf"]),
+        "-pix_fmt", profile["pix_fmt"],
+    ]
+
+
+def audio_codec_args(profile):
+    """프로필의 오디오 인코더 인자"""
+    return ["-c:a", profile["audio_codec"], "-b:a", profile["audio_bitrate"]]
+
+
+def encoder_key(profile):
+    """캐시 키에 넣을 인코더 관련 설정만 추림"""
+    return {key: profile[key] for key in ("codec", "preset", "crf", "pix_fmt")}
@@ -0,0 +1,100 @@
+"""Python에서 만든 프레임을 FFmpeg stdin으로 바로 보내는 rawvideo 파이프
+
+fallback 타이틀 카드나 코드로 만든 배경처럼 Python 안에서 생성한 프레임은 JPEG로 저장했다가
+FFmpeg가 다시 디코딩할 필요가 없다. 여기서는 프레임을 rgb24 rawvideo로 FFmpeg 입력 0번(pipe:0)에 쓴다.
+
+    cmd = ["ffmpeg", "-y", *rawvideo_input_args(profile), *video_codec_args(profile), "out.mp4"]
+    pipe_frames(cmd, slide_frames(images, profile, durations, title_cards))
+
+프레임은 (데이터, 반복 횟수) 쌍으로 넘긴다. 정지 슬라이드는 프레임 하나를 반복 횟수만큼 다시 쓰므로
+슬라이드마다 rgb24 변환(tobytes)을 한 번만 하고, 그 bytes를 중간 버퍼에 복사하지 않고 그대로 파이프에 쓴다.
+"""
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from scripts.tracing import span
+from scripts.title_card import title_card_image
+
+
+def rawvideo_input_args(profile):
+    """stdin rawvideo 입력 인자 (입력 0번)"""
+    return [
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{profile['width']}x{profile['height']}",
+        "-r", str(profile["fps"]),
+        "-i", "pipe:0",
+    ]
+
+
+def fit_frame(image_path, width, height):
+    """이미지를 비율 유지로 맞춘 뒤 검은 여백을 넣은 width x height RGB 이미지
+
+    filter 엔진의 scale(force_original_aspect_ratio=decrease) + pad와 같은 결과를 만든다.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(image_path) as img:
+        fitted = ImageOps.contain(img.convert("RGB"), (width, height))
+    frame = Image.new("RGB", (width, height), (0, 0, 0))
+    frame.paste(fitted, ((width - fitted.width) // 2, (height - fitted.height) // 2))
+    return frame
+
+
+def slide_frames(valid_images, profile, durations, title_cards=None):
+    """슬라이드별 (프레임 데이터, 반복 횟수) 생성기
+
+    title_cards({이미지 경로: 텍스트})에 있는 슬라이드는 파일을 읽지 않고 카드를 바로 그리고,
+    나머지는 이미지를 한 번 디코딩해 프레임 크기로 맞춘다.
+    """
+    width, height, fps = profile["width"], profile["height"], profile["fps"]
+    cards = {str(Path(path).absolute()): text for path, text in (title_cards or {}).items()}
+
+    for image_path, duration in zip(valid_images, durations):
+        key = str(Path(image_path).absolute())
+        if key in cards:
+            slide = title_card_image(cards[key], width, height)
+        else:
+            slide = fit_frame(image_path, width, height)
+        yield slide.tobytes(), max(1, round(duration * fps))
+
+
+def pipe_frames(cmd, frames, name="ffmpeg.rawpipe"):
+    """frames의 (데이터, 반복 횟수)를 FFmpeg stdin에 쓰며 cmd 실행
+
+    traced_run(check=True)처럼 실패하면 CalledProcessError(stderr 포함)를 던진다.
+    stderr는 파이프가 가득 차 멈추지 않도록 임시 파일로 받는다.
+    """
+    with span(name) as s, tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        frame_count = 0
+        written = 0
+        try:
+            for data, repeat in frames:
+                for _ in range(repeat):
+                    process.stdin.write(data)
+                frame_count += repeat
+                written += len(data) * repeat
+            process.stdin.close()
+        except BrokenPipeError:
+            # FFmpeg가 먼저 종료됨 (아래에서 종료 코드와 stderr로 보고)
+            pass
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        returncode = process.wait()
+
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", errors="replace")
+        s.set(exit_code=returncode, frames=frame_count, piped_bytes=written)
+        if returncode != 0:
+            s.fail(stderr[-500:])
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+
+        output_path = str(cmd[-1])
+        if os.path.isfile(output_path):
+            s.set(bytes=os.path.getsize(output_path))
+    return frame_count
@@ -0,0 +1,139 @@
+"""단계 최신 여부 추적 (make처럼 바뀐 단계만 다시 실행)
+
+단계마다 입력 지문(읽는 메타데이터 값, 그 값이 가리키는 파일의 내용 해시, 관련 config.yaml 섹션과
+환경 변수, 단계 모듈과 그 모듈이 가져오는 scripts 모듈 전체의 소스)과
+출력 지문(쓰는 메타데이터 값과 출력 파일 내용 해시)을 metadata["stage_state"][단계 이름]에 기록한다. 다시 실행할 때 입력 지문이 같고, 출력 값이 그대로이며,
+출력 파일이 디스크에 남아 내용도 같으면 그 단계는 건너뛴다.
+"""
+import ast
+import hashlib
+import inspect
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from scripts.utils import load_config, get_env_var
+from scripts.asset_cache import hash_file
+
+# 파일 해시 메모 ((경로, 크기, 수정 시각) → sha256). 큰 영상 파일을 매번 다시 읽지 않도록 함
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+# 코드 의존성으로 추적하는 패키지 (scripts/*.py)
+PACKAGE = __name__.split(".")[0]
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def _file_digest(path):
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        if memo_key in _file_hashes:
+            return _file_hashes[memo_key]
+    digest = hash_file(path)
+    with _file_hashes_lock:
+        _file_hashes[memo_key] = digest
+    return digest
+
+
+def resolve_files(value):
+    """값 안의 기존 파일 경로 문자열을 {"file": 경로, "sha256": 해시}로 바꾼 사본
+
+    파일이 사라졌으면 경로 문자열이 그대로 남으므로 지문이 달라진다.
+    """
+    if isinstance(value, dict):
+        return {key: resolve_files(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [resolve_files(item) for item in value]
+    if isinstance(value, str) and len(value) < 1024 and "\n" not in value and os.path.isfile(value):
+        return {"file": value, "sha256": _file_digest(value)}
+    return value
+
+
+def _digest(data):
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_dependencies(module):
+    """모듈과 그 모듈이 (함수 안의 지연 import까지) 직간접적으로 가져오는 scripts 모듈의 파일 목록
+
+    소스를 파싱만 하고 import하지 않으므로 아직 로드되지 않은 모듈도 포함된다.
+    """
+    files = {}
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        parts = name.split(".")
+        if parts[0] != PACKAGE or len(parts) != 2 or name in files:
+            continue
+        path = PACKAGE_DIR / f"{parts[1]}.py"
+        files[name] = str(path) if path.is_file() else None
+        if not files[name]:
+            continue
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module)
+                pending.extend(f"{node.module}.{alias.name}" for alias in node.names)  # from scripts import x
+    return tuple(sorted(path for path in files.values() if path))
+
+
+def _code_digest(func):
+    """단계 함수의 코드 지문 (함수 모듈과 그 코드 의존성 파일의 해시)"""
+    sources = code_dependencies(getattr(func, "__module__", "") or "")
+    if not sources:
+        try:
+            source = inspect.getsourcefile(func)
+        except TypeError:
+            source = None  # 람다 등 소스 파일을 알 수 없는 함수
+        sources = (source,) if source else ()
+    try:
+        return {os.path.relpath(path, PACKAGE_DIR.parent): _file_digest(path) for path in sources}
+    except OSError:
+        return None
+
+
+def input_fingerprint(stage, metadata):
+    """단계 입력 지문"""
+    config = load_config() or {}
+    code = _code_digest(stage.func)
+    return _digest({
+        "reads": {key: resolve_files(metadata.get(key)) for key in stage.reads},
+        "config": {section: config.get(section) for section in stage.config},
+        "env": {name: get_env_var(name, "") for name in stage.env},
+        "code": code,
+    })
+
+
+def output_fingerprint(stage, metadata):
+    """단계 출력 지문 (출력 파일이 없으면 해시가 달라져 최신이 아닌 것으로 판단됨)"""
+    return _digest({key: resolve_files(metadata.get(key)) for key in stage.writes})
+
+
+def is_fresh(stage, metadata):
+    """이전 실행 기록과 비교해 단계를 건너뛰어도 되는지"""
+    if not stage.writes:
+        return False
+    if stage.random_unless and not any(get_env_var(name, "") for name in stage.random_unless):
+        return False  # 무작위로 고르는 단계 (예: TOPIC 없는 generate_prompt)
+    state = (metadata.get("stage_state") or {}).get(stage.name)
+    if not state:
+        return False
+    if any(key not in metadata for key in stage.writes):
+        return False
+    return (state.get("inputs") == input_fingerprint(stage, metadata)
+            and state.get("outputs") == output_fingerprint(stage, metadata))
+
+
+def record(stage, metadata, inputs):
+    """성공한 단계의 입력/출력 지문 기록 (inputs는 실행 전에 계산한 입력 지문)"""
+    metadata.setdefault("stage_state", {})[stage.name] = {
+        "inputs": inputs,
+        "outputs": output_fingerprint(stage, metadata),
+    }
@@ -1,7 +1,11 @@
 """ElevenLabs TTS를 사용한 음성 생성"""
-import requests
 import os
+import shutil
 import sys
+import tempfile
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -10,18 +14,44 @@ project_root = os.path.dirname(script_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from scripts.utils import get_output_dir, load_metadata, get_env_var, save_metadata
+from scripts.utils import (get_output_dir, load_metadata, get_env_var, save_metadata, probe_duration,
+                           stream_to_file, load_config)
+from scripts.asset_cache import get_cache
+from scripts.tracing import span, traced_run, current_span
+from scripts.timeline import split_sentences
+from scripts.http_client import get_client
 
 ELEVENLABS_API_KEY = get_env_var("ELEVENLABS_API_KEY", "")
+# 벤치마크/테스트에서 로컬 대체 서버를 쓸 수 있도록 API 주소를 환경 변수로 변경 가능
+ELEVENLABS_API_URL = get_env_var("ELEVENLABS_API_URL", "https://api.elevenlabs.io").rstrip("/")
 
+ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # 기본 한국어 음성 ID
+ELEVENLABS_MODEL_ID = "eleven_multilingual_v2"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75
+}
 
-def generate_audio_with_elevenlabs(text, output_path):
+GTTS_LANG = "ko"
+
+# TTS 응답 최대 크기
+MAX_AUDIO_BYTES = 50 * 1024 * 1024
+
+# chunked: 문장마다 따로 합성(동시 진행, 문장별 캐시)한 뒤 이어 붙임, whole: 스크립트 전체를 한 번에 합성
+TTS_MODES = ("chunked", "whole")
+DEFAULT_TTS_MODE = "chunked"
+# 동시에 합성할 문장 수 기본값 (config.yaml의 audio.max_concurrency로 변경)
+DEFAULT_TTS_CONCURRENCY = 4
+
+
+def generate_audio_with_elevenlabs(text, output_path, voice_id=ELEVENLABS_VOICE_ID):
     """ElevenLabs TTS API를 사용한 음성 생성"""
     if not ELEVENLABS_API_KEY:
         print("⚠️ ElevenLabs API 키가 없습니다.")
         return None
     
-    url = "https://api.elevenlabs.io/v1/text-to-speech/21m00Tcm4TlvDq8ikWAM"  # 기본 한국어 음성 ID
+    # 스트리밍 엔드포인트: 합성되는 대로 청크를 받아 파일에 기록
+    url = f"{ELEVENLABS_API_URL}/v1/text-to-speech/{voice_id}/stream"
     
     headers = {
         "Accept": "audio/mpeg",
@@ -31,19 +61,14 @@ def generate_audio_with_elevenlabs(text, output_path):
     
     data = {
         "text": text,
-        "model_id": "eleven_multilingual_v2",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.75
-        }
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS
     }
     
     try:
-        response = requests.post(url, json=data, headers=headers, timeout=60)
-        response.raise_for_status()
-        
-        with open(output_path, "wb") as f:
-            f.write(response.content)
+        with span("tts.elevenlabs", chars=len(text)) as s:
+            response = get_client("elevenlabs").post(url, json=data, headers=headers, stream=True)
+            s.set(bytes=stream_to_file(response, output_path, max_bytes=MAX_AUDIO_BYTES))
         
         print(f"✅ 음성 생성 완료: {output_path}")
         return str(output_path)
@@ -59,8 +84,19 @@ def generate_audio_fallback(text, output_path):
     try:
         from gtts import gTTS
         
-        tts = gTTS(text=text, lang='ko', slow=False)
-        tts.save(str(output_path))
+        tts = gTTS(text=text, lang=GTTS_LANG, slow=False)
+        # 임시 파일에 저장한 뒤 이름 변경 (실패 시 불완전한 파일을 남기지 않음)
+        output_path = Path(output_path)
+        fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+        try:
+            with span("tts.gtts", chars=len(text)) as s:
+                with os.fdopen(fd, "wb") as f:
+                    tts.write_to_fp(f)
+                s.set(bytes=os.path.getsize(tmp_path))
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
         
         print(f"✅ 음성 생성 완료 (gTTS): {output_path}")
         return str(output_path)
@@ -72,37 +108,200 @@ def generate_audio_fallback(text, output_path):
         return None
 
 
-def generate_audio():
+def normalize_tts_text(text):
+    """캐시 키와 API 요청에 공통으로 쓰는 텍스트 정규화 (NFC + 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def synthesize_with_cache(text, output_path, backend, voice_id, model_id, voice_settings, synthesize):
+    """TTS 캐시를 거쳐 음성 생성
+    
+    키는 (정규화된 텍스트, 백엔드, 음성 ID, 모델, 음성 설정)이고 항목에는 측정한 길이를 함께 저장한다.
+    반환값: (오디오 경로, 길이(초)) / 실패 시 (None, None)
+    """
+    cache = get_cache("tts")
+    cache_key = cache.make_key(
+        text=text,
+        backend=backend,
+        voice_id=voice_id,
+        model_id=model_id,
+        voice_settings=voice_settings
+    )
+    
+    with span("tts.synthesize", backend=backend, chars=len(text)) as s:
+        entry = cache.get_entry(cache_key)
+        s.set(cache_hit=bool(entry))
+        if entry:
+            shutil.copyfile(entry["path"], output_path)
+            print(f"✅ 음성 캐시 적중 ({backend}): {output_path}")
+            # ffprobe 없이 저장된 항목은 길이가 없으므로 다시 측정
+            return str(output_path), entry["meta"].get("duration") or probe_duration(output_path)
+        
+        result = synthesize(text, output_path)
+        if not result:
+            s.fail(f"{backend} 합성 실패")
+            return None, None
+        
+        duration = probe_duration(result)
+        s.set(duration=duration)
+        cache.put_file(cache_key, result, meta={"duration": duration, "backend": backend, "chars": len(text)})
+        return result, duration
+
+
+def tts_backends(voice_id=ELEVENLABS_VOICE_ID):
+    """시도할 TTS 백엔드 목록 (synthesize_with_cache 인자: 이름, 음성 ID, 모델, 음성 설정, 합성 함수)"""
+    backends = []
+    if ELEVENLABS_API_KEY:
+        backends.append((
+            "elevenlabs", voice_id, ELEVENLABS_MODEL_ID, ELEVENLABS_VOICE_SETTINGS,
+            partial(generate_audio_with_elevenlabs, voice_id=voice_id)
+        ))
+    backends.append(("gtts", f"gtts:{GTTS_LANG}", "gtts", {"slow": False}, generate_audio_fallback))
+    return backends
+
+
+def synthesize_script(script_text, audio_path, voice_id=ELEVENLABS_VOICE_ID):
+    """ElevenLabs → gTTS 순으로 캐시를 거쳐 음성 생성
+    
+    반환값: (오디오 경로, 길이(초)) / 실패 시 (None, None)
+    """
+    for i, backend in enumerate(tts_backends(voice_id)):
+        if i:
+            print(f"  {backend[0]}로 음성 생성 시도...")
+        result, duration = synthesize_with_cache(script_text, audio_path, *backend)
+        if result:
+            return result, duration
+    return None, None
+
+
+def concat_audio(chunk_paths, audio_path):
+    """같은 백엔드로 만든 MP3 조각들을 재인코딩 없이 이어 붙임 (concat demuxer, 임시 파일 → 이름 변경)"""
+    audio_path = Path(audio_path)
+    list_path = audio_path.with_name(f".{audio_path.stem}_concat.txt")
+    tmp_path = audio_path.with_name(f".{audio_path.name}.part.mp3")
+    entries = [str(Path(path).absolute()).replace("'", "'\\''") for path in chunk_paths]
+    list_path.write_text("".join(f"file '{entry}'\n" for entry in entries), encoding="utf-8")
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_path),
+        "-c", "copy",
+        str(tmp_path)
+    ]
+    try:
+        result = traced_run(cmd, name="ffmpeg.audio_concat")
+        if result.returncode != 0:
+            print(f"❌ 음성 이어 붙이기 실패: {result.stderr[-300:]}")
+            return None
+        os.replace(tmp_path, audio_path)
+        return str(audio_path)
+    finally:
+        list_path.unlink(missing_ok=True)
+        tmp_path.unlink(missing_ok=True)
+
+
+def synthesize_chunked(sentences, audio_path, voice_id=ELEVENLABS_VOICE_ID, max_workers=DEFAULT_TTS_CONCURRENCY):
+    """문장별로 동시에 합성(문장마다 캐시)한 뒤 하나의 MP3로 이어 붙임
+    
+    한 파일 안에서 코덱 설정이 섞이지 않도록 모든 문장을 같은 백엔드로 합성하고,
+    한 문장이라도 실패하면 다음 백엔드로 전체를 다시 시도한다 (이미 합성된 문장은 캐시에 남는다).
+    길이를 잴 수 없으면(ffprobe 없음) 음성은 그대로 쓰고 길이 대신 None을 돌려준다.
+    반환값: (오디오 경로, 전체 길이(초) 또는 None, 문장별 길이 목록 또는 None) / 실패 시 (None, None, None)
+    """
+    audio_path = Path(audio_path)
+    chunk_dir = audio_path.with_name(f".{audio_path.stem}_chunks")
+    chunk_dir.mkdir(exist_ok=True)
+    parent = current_span()
+    
+    try:
+        for i, backend in enumerate(tts_backends(voice_id)):
+            if i:
+                print(f"  {backend[0]}로 음성 생성 시도...")
+            
+            with span("tts.chunked", parent=parent, backend=backend[0], sentences=len(sentences)) as s:
+                def synthesize(indexed_sentence):
+                    n, sentence = indexed_sentence
+                    with span("tts.chunk", parent=s, index=n):
+                        return synthesize_with_cache(sentence, chunk_dir / f"chunk_{n:03d}.mp3", *backend)
+                
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(executor.map(synthesize, enumerate(sentences)))
+                if not all(path for path, _ in results):
+                    s.fail(f"{backend[0]} 문장 합성 실패")
+                    continue
+                
+                chunk_paths = [path for path, _ in results]
+                if len(chunk_paths) == 1:
+                    shutil.copyfile(chunk_paths[0], audio_path)
+                elif not concat_audio(chunk_paths, audio_path):
+                    # 백엔드를 바꿔도 이어 붙일 수 없으므로 호출자가 whole 방식으로 다시 시도
+                    s.fail("이어 붙이기 실패")
+                    break
+                if not all(duration for _, duration in results):
+                    return str(audio_path), probe_duration(audio_path), None
+                durations = [round(duration, 3) for _, duration in results]
+                return str(audio_path), round(sum(durations), 3), durations
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+    return None, None, None
+
+
+def tts_settings():
+    """config.yaml audio 섹션의 TTS 방식과 동시 합성 수"""
+    config = (load_config() or {}).get("audio") or {}
+    mode = config.get("mode") or DEFAULT_TTS_MODE
+    if mode not in TTS_MODES:
+        raise ValueError(f"알 수 없는 TTS 방식: {mode} (사용 가능: {', '.join(TTS_MODES)})")
+    return mode, config.get("max_concurrency", DEFAULT_TTS_CONCURRENCY)
+
+
+def synthesize_speech(script, audio_path, voice_id=ELEVENLABS_VOICE_ID):
+    """설정된 방식(chunked/whole)으로 스크립트 음성 생성
+    
+    chunked는 자막과 같은 문장 분리(timeline.split_sentences)를 사용하므로 문장별 길이가 자막 큐와 1:1로 맞는다.
+    반환값: (오디오 경로, 길이(초), 문장별 길이 목록 또는 None) / 실패 시 (None, None, None)
+    """
+    mode, max_workers = tts_settings()
+    sentences = [normalize_tts_text(sentence) for sentence in split_sentences(script)]
+    if mode == "chunked" and len(sentences) > 1:
+        result = synthesize_chunked(sentences, audio_path, voice_id, max_workers)
+        if result[0]:
+            return result
+        print("⚠️ 문장별 합성 실패, 스크립트 전체를 한 번에 합성합니다.")
+    
+    result, duration = synthesize_script(normalize_tts_text(script), audio_path, voice_id)
+    if result and duration and len(sentences) == 1:
+        return result, duration, [duration]
+    return result, duration, None
+
+
+def generate_audio(metadata=None):
     """음성 생성"""
-    metadata = load_metadata()
+    standalone = metadata is None
+    if standalone:
+        metadata = load_metadata()
     if not metadata:
         print("❌ 메타데이터를 찾을 수 없습니다.")
         return
     
-    script_text = metadata.get("script", "")
-    if not script_text:
+    script = metadata.get("script", "")
+    if not normalize_tts_text(script):
         print("❌ 스크립트가 없습니다.")
         return
     
     output_dir = get_output_dir()
     audio_path = output_dir / "audio.mp3"
     
-    print(f"🔊 음성 생성 중... (텍스트 길이: {len(script_text)}자)")
-    
-    # ElevenLabs 시도
-    if ELEVENLABS_API_KEY:
-        result = generate_audio_with_elevenlabs(script_text, audio_path)
-        if result:
-            metadata["audio_path"] = result
-            save_metadata(metadata)
-            return result
+    print(f"🔊 음성 생성 중... (텍스트 길이: {len(normalize_tts_text(script))}자, 문장 {len(split_sentences(script))}개)")
     
-    # Fallback: gTTS 사용
-    print("  gTTS로 음성 생성 시도...")
-    result = generate_audio_fallback(script_text, audio_path)
+    result, duration, sentence_durations = synthesize_speech(script, audio_path)
     if result:
         metadata["audio_path"] = result
-        save_metadata(metadata)
+        metadata["audio_duration"] = duration
+        # 문장별 길이: 타임라인이 자막 큐를 문장 경계에 정확히 맞추는 데 사용
+        metadata["sentence_durations"] = sentence_durations
+        if standalone:
+            save_metadata(metadata)
         return result
     
     print("❌ 음성 생성 실패")
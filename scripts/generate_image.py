@@ -1,7 +1,8 @@
 """이미지 생성/다운로드"""
-import requests
 import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -10,35 +11,37 @@ project_root = os.path.dirname(script_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from scripts.utils import get_output_dir, load_metadata, get_env_var, save_metadata
+from scripts.utils import get_output_dir, load_metadata, get_env_var, save_metadata, load_config, stream_to_file
+from scripts.asset_cache import get_cache
+from scripts.tracing import span, traced_run, current_span
+from scripts.title_card import render_title_card, HAS_PIL
+from scripts.http_client import get_client
 
 UNSPLASH_ACCESS_KEY = get_env_var("UNSPLASH_ACCESS_KEY", "")
+# 벤치마크/테스트에서 로컬 대체 서버를 쓸 수 있도록 API 주소를 환경 변수로 변경 가능
+UNSPLASH_API_URL = get_env_var("UNSPLASH_API_URL", "https://api.unsplash.com").rstrip("/")
 
-# PIL/Pillow import (fallback용)
-try:
-    from PIL import Image, ImageDraw, ImageFont
-    HAS_PIL = True
-    print(f"✅ PIL/Pillow 로드 성공")
-except ImportError as e:
-    HAS_PIL = False
-    print(f"❌ PIL/Pillow 로드 실패: {e}")
+IMAGE_WIDTH = 1080
+IMAGE_HEIGHT = 1920
+
+# 다운로드 이미지 최대 크기
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+
+# 동시에 처리할 이미지 수 기본값 (config.yaml의 image.max_concurrency로 변경)
+DEFAULT_MAX_CONCURRENCY = 4
 
 
 def download_image(url, filepath):
-    """이미지 다운로드"""
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    
-    with open(filepath, "wb") as f:
-        f.write(response.content)
+    """이미지 다운로드 (스트리밍, 임시 파일 → 원자적 이름 변경)"""
+    with span("image.download") as s:
+        response = get_client("image_cdn").get(url, stream=True)
+        s.set(bytes=stream_to_file(response, filepath, max_bytes=MAX_IMAGE_BYTES))
     
     return filepath
 
 
 def create_image_with_ffmpeg(text, width=1080, height=1920, output_path=None):
-    """FFmpeg를 사용한 이미지 생성 (가장 안정적인 fallback)"""
-    import subprocess
-    
+    """FFmpeg를 사용한 이미지 생성 (PIL이 없을 때의 fallback)"""
     if not output_path:
         return None
     
@@ -58,14 +61,11 @@ def create_image_with_ffmpeg(text, width=1080, height=1920, output_path=None):
             output_path_str
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = traced_run(cmd, name="ffmpeg.text_card", timeout=30)
         
         if result.returncode == 0 and os.path.exists(output_path_str) and os.path.getsize(output_path_str) > 0:
-            print(f"  [DEBUG] FFmpeg 이미지 생성 성공: {output_path_str}")
             return output_path_str
         else:
-            print(f"  [DEBUG] FFmpeg 이미지 생성 실패: {result.stderr}")
-            
             # drawtext 없이 단색 이미지만 생성 시도
             cmd_simple = [
                 "ffmpeg", "-y",
@@ -74,142 +74,39 @@ def create_image_with_ffmpeg(text, width=1080, height=1920, output_path=None):
                 "-vframes", "1",
                 output_path_str
             ]
-            result2 = subprocess.run(cmd_simple, capture_output=True, text=True, timeout=30)
+            result2 = traced_run(cmd_simple, name="ffmpeg.plain_card", timeout=30)
             
             if result2.returncode == 0 and os.path.exists(output_path_str) and os.path.getsize(output_path_str) > 0:
-                print(f"  [DEBUG] FFmpeg 단색 이미지 생성 성공: {output_path_str}")
                 return output_path_str
             
     except Exception as e:
-        print(f"  [DEBUG] FFmpeg 이미지 생성 오류: {e}")
+        print(f"  ⚠️ FFmpeg 이미지 생성 오류: {e}")
     
     return None
 
 
 def create_text_image(text, width=1080, height=1920, output_path=None):
-    """텍스트 기반 이미지 생성 (PIL fallback)"""
-    print(f"  [DEBUG] create_text_image 호출됨, HAS_PIL={HAS_PIL}")
-    
-    if not HAS_PIL:
-        print(f"  [DEBUG] PIL 없음, FFmpeg fallback 시도")
-        return create_image_with_ffmpeg(text, width, height, output_path)
-    
-    try:
-        # 이미지 생성
-        print(f"  [DEBUG] 이미지 객체 생성 중...")
-        img = Image.new('RGB', (width, height), color=(30, 30, 50))
-        draw = ImageDraw.Draw(img)
-        print(f"  [DEBUG] 이미지 객체 생성 완료")
-        
-        # 폰트 설정 (기본 폰트 사용)
-        font_size = 60
-        font = None
-        
-        # 여러 폰트 경로 시도
-        font_paths = [
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-            "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-            "/System/Library/Fonts/Helvetica.ttc",
-            "/System/Library/Fonts/Arial.ttf",
-        ]
-        
-        print(f"  [DEBUG] 폰트 검색 시작...")
-        for font_path in font_paths:
-            try:
-                if os.path.exists(font_path):
-                    font = ImageFont.truetype(font_path, font_size)
-                    print(f"  [DEBUG] 폰트 발견: {font_path}")
-                    break
-            except Exception as fe:
-                print(f"  [DEBUG] 폰트 로드 실패 {font_path}: {fe}")
-                continue
-        
-        # 폰트를 찾지 못한 경우 기본 폰트 사용
-        if font is None:
-            print(f"  [DEBUG] 시스템 폰트 없음, 기본 폰트 사용")
-            try:
-                font = ImageFont.load_default()
-                font_size = 20  # 기본 폰트는 작음
-                print(f"  [DEBUG] 기본 폰트 로드 성공")
-            except Exception as de:
-                print(f"  [DEBUG] 기본 폰트 로드 실패: {de}")
-                font = None
-        
-        # 폰트가 여전히 없으면 단순 이미지만 저장
-        if font is None:
-            print(f"  [DEBUG] 폰트 없이 단색 이미지 저장")
-            if output_path:
-                img.save(output_path, 'JPEG', quality=85)
-                print(f"  [DEBUG] 단색 이미지 저장 완료: {output_path}")
-                return str(output_path)
-            return img
-        
-        # 텍스트 줄바꿈 처리
-        words = text.split()
-        lines = []
-        current_line = []
-        max_width = width - 100
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            text_width = bbox[2] - bbox[0]
-            
-            if text_width <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        print(f"  [DEBUG] 텍스트 라인 수: {len(lines)}")
-        
-        # 텍스트 그리기 (중앙 정렬)
-        total_height = len(lines) * 80
-        start_y = (height - total_height) // 2
-        
-        for i, line in enumerate(lines):
-            bbox = draw.textbbox((0, 0), line, font=font)
-            text_width = bbox[2] - bbox[0]
-            x = (width - text_width) // 2
-            y = start_y + i * 80
-            
-            # 그림자 효과
-            draw.text((x + 2, y + 2), line, font=font, fill=(0, 0, 0))
-            draw.text((x, y), line, font=font, fill=(255, 255, 255))
-        
-        # 이미지 저장
-        if output_path:
-            output_path_str = str(output_path)
-            print(f"  [DEBUG] 이미지 저장 시도: {output_path_str}")
-            img.save(output_path_str, 'JPEG', quality=85)
-            print(f"  [DEBUG] 이미지 저장 완료: {output_path_str}")
-            # 저장 후 파일 확인
-            if os.path.exists(output_path_str):
-                file_size = os.path.getsize(output_path_str)
-                print(f"  [DEBUG] 저장된 파일 크기: {file_size} bytes")
-            else:
-                print(f"  [DEBUG] 저장 후 파일이 존재하지 않음!")
-            return output_path_str
-        
-        return img
-    except Exception as e:
-        import traceback
-        print(f"  ⚠️ 텍스트 이미지 생성 실패: {e}")
-        print(f"  [DEBUG] 상세 오류: {traceback.format_exc()}")
+    """텍스트 기반 이미지 생성 (PIL fallback, scripts/title_card.py의 메모이즈된 렌더러 사용)"""
+    if not HAS_PIL or not output_path:
         return None
+    
+    return render_title_card(text, output_path, width, height)
+
+
+def placeholder_image_url(query, width=1080, height=1920):
+    """placeholder 이미지 URL (API 키가 없거나 Unsplash를 쓸 수 없을 때)"""
+    return f"https://via.placeholder.com/{width}x{height}?text={query.replace(' ', '+')}"
 
 
 def get_image_from_unsplash(query, width=1080, height=1920):
-    """Unsplash에서 이미지 가져오기"""
+    """Unsplash에서 이미지 URL 가져오기 (일시적 오류는 http_client가 재시도)
+    
+    API 키가 없거나 재시도 후에도 실패하면 None을 반환하고, 호출자가 fallback으로 넘어간다.
+    """
     if not UNSPLASH_ACCESS_KEY:
-        # API 키가 없으면 placeholder 이미지 URL 반환
-        return f"https://via.placeholder.com/{width}x{height}?text={query.replace(' ', '+')}"
+        return None
     
-    url = "https://api.unsplash.com/photos/random"
+    url = f"{UNSPLASH_API_URL}/photos/random"
     headers = {"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"}
     params = {
         "query": query,
@@ -219,19 +116,101 @@ def get_image_from_unsplash(query, width=1080, height=1920):
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data["urls"]["regular"]
+        response = get_client("unsplash").get(url, headers=headers, params=params)
+        return response.json()["urls"]["regular"]
     except Exception as e:
         print(f"⚠️ Unsplash API 오류: {e}")
-        # Fallback: placeholder 이미지
-        return f"https://via.placeholder.com/{width}x{height}?text={query.replace(' ', '+')}"
+        return None
 
 
-def generate_images():
+def acquire_image(prompt, image_path, cache, parent=None):
+    """캐시 → Unsplash 다운로드 → fallback 렌더링 순으로 이미지 확보
+    
+    캐시 키는 (프롬프트, 크기, 소스)이며, 적중하면 네트워크 요청 없이 복사만 한다.
+    실제 Unsplash 이미지만 unsplash 키에 저장하고, placeholder/타이틀 카드는 fallback 키에 저장한다
+    (Unsplash 장애 중에 받은 대체 이미지가 복구 후에도 계속 재사용되지 않도록).
+    parent는 스레드 풀에서 호출할 때 연결할 부모 span이다.
+    반환값: 이미지 출처(cache, download, cache_fallback, cache_placeholder, placeholder, fallback), 실패하면 None
+    """
+    with span("image.acquire", parent=parent) as s:
+        result = _acquire_image(prompt, Path(image_path), cache)
+        s.set(source=result, cache_hit=result.startswith("cache"))
+        if result == "failed":
+            s.fail("이미지 확보 실패")
+        elif os.path.exists(image_path):
+            s.set(bytes=os.path.getsize(image_path))
+        return result if result != "failed" else None
+
+
+def _acquire_image(prompt, image_path, cache):
+    """acquire_image 본체. 이미지 출처(cache, download, cache_fallback, cache_placeholder, placeholder, fallback, failed)를 반환"""
+    image_filename = Path(image_path).name
+    
+    if UNSPLASH_ACCESS_KEY:
+        cache_key = cache.make_key(prompt=prompt, width=IMAGE_WIDTH, height=IMAGE_HEIGHT, source="unsplash")
+        cached = cache.get(cache_key)
+        if cached:
+            shutil.copyfile(cached, image_path)
+            print(f"  ✅ {image_filename} 캐시 적중")
+            return "cache"
+        
+        # Unsplash에서 이미지 가져오기
+        image_url = get_image_from_unsplash(prompt, IMAGE_WIDTH, IMAGE_HEIGHT)
+        if image_url and _download(image_url, image_path):
+            cache.put_file(cache_key, image_path, meta={"prompt": prompt, "source": "unsplash"})
+            print(f"  ✅ {image_filename} 저장 완료")
+            return "download"
+    
+    # Unsplash를 쓸 수 없으면 대체 이미지 (fallback 키에만 캐시)
+    fallback_key = cache.make_key(prompt=prompt, width=IMAGE_WIDTH, height=IMAGE_HEIGHT, source="fallback")
+    entry = cache.get_entry(fallback_key)
+    if entry:
+        shutil.copyfile(entry["path"], image_path)
+        # 캐시 항목의 원래 출처: placeholder 이미지는 타이틀 카드로 다시 그리면 안 됨
+        if entry["meta"].get("source") == "placeholder":
+            print(f"  ✅ {image_filename} 캐시 적중 (placeholder)")
+            return "cache_placeholder"
+        print(f"  ✅ {image_filename} 캐시 적중 (fallback)")
+        return "cache_fallback"
+    
+    if _download(placeholder_image_url(prompt, IMAGE_WIDTH, IMAGE_HEIGHT), image_path):
+        cache.put_file(fallback_key, image_path, meta={"prompt": prompt, "source": "placeholder"})
+        print(f"  ✅ {image_filename} 저장 완료 (placeholder)")
+        return "placeholder"
+    
+    print(f"  🔄 Fallback 이미지 생성 시도...")
+    
+    # 1차 시도: 프로세스 안에서 타이틀 카드 렌더링 (FFmpeg 실행 없음)
+    result = create_text_image(prompt, width=IMAGE_WIDTH, height=IMAGE_HEIGHT, output_path=str(image_path))
+    
+    # 2차 시도: FFmpeg로 이미지 생성
+    if not result:
+        print(f"  🔄 FFmpeg 이미지 생성 시도...")
+        result = create_image_with_ffmpeg(prompt, width=IMAGE_WIDTH, height=IMAGE_HEIGHT, output_path=str(image_path))
+    
+    if result and os.path.exists(result) and os.path.getsize(result) > 0:
+        cache.put_file(fallback_key, image_path, meta={"prompt": prompt, "source": "fallback"})
+        print(f"  ✅ {image_filename} 생성 완료 (fallback)")
+        return "fallback"
+    
+    return "failed"
+
+
+def _download(url, image_path):
+    """다운로드해서 비어 있지 않은 파일이 생기면 True"""
+    try:
+        download_image(url, image_path)
+    except Exception as e:
+        print(f"  ⚠️ 이미지 다운로드 실패: {e}")
+        return False
+    return image_path.exists() and image_path.stat().st_size > 0
+
+
+def generate_images(metadata=None):
     """이미지 생성/다운로드"""
-    metadata = load_metadata()
+    standalone = metadata is None
+    if standalone:
+        metadata = load_metadata()
     if not metadata:
         print("❌ 메타데이터를 찾을 수 없습니다. generate_prompt.py를 먼저 실행하세요.")
         return
@@ -243,53 +222,45 @@ def generate_images():
         print("❌ 이미지 프롬프트가 없습니다.")
         return
     
-    image_paths = []
-    
-    print(f"🖼️ {len(image_prompts)}개의 이미지 생성 중...")
+    cache = get_cache("images")
+    image_config = (load_config() or {}).get("image", {}) or {}
+    max_workers = max(1, min(len(image_prompts), image_config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)))
+    print(f"🖼️ {len(image_prompts)}개의 이미지 생성 중... (동시 {max_workers}개)")
+    parent = current_span()
     
-    for i, prompt in enumerate(image_prompts, 1):
+    def acquire(indexed_prompt):
+        i, prompt = indexed_prompt
         print(f"  [{i}/{len(image_prompts)}] {prompt[:50]}...")
-        
-        # Unsplash에서 이미지 가져오기
-        image_url = get_image_from_unsplash(prompt)
-        
-        # 이미지 다운로드
-        image_filename = f"image_{i:02d}.jpg"
-        image_path = output_dir / image_filename
-        
-        success = False
-        try:
-            download_image(image_url, image_path)
-            # 파일이 제대로 생성되었는지 확인
-            if image_path.exists() and image_path.stat().st_size > 0:
-                image_paths.append(str(image_path))
-                print(f"  ✅ {image_filename} 저장 완료")
-                success = True
-        except Exception as e:
-            print(f"  ⚠️ 이미지 다운로드 실패: {e}")
-        
-        # 다운로드 실패 시 텍스트 기반 이미지 생성 (fallback)
-        if not success:
-            print(f"  🔄 Fallback 이미지 생성 시도...")
-            
-            # 1차 시도: FFmpeg로 이미지 생성 (가장 안정적)
-            result = create_image_with_ffmpeg(prompt, width=1080, height=1920, output_path=str(image_path))
-            
-            # 2차 시도: PIL로 이미지 생성
-            if not result:
-                print(f"  🔄 PIL 이미지 생성 시도...")
-                result = create_text_image(prompt, width=1080, height=1920, output_path=str(image_path))
-            
-            if result and os.path.exists(result) and os.path.getsize(result) > 0:
-                image_paths.append(str(image_path))
-                print(f"  ✅ {image_filename} 생성 완료 (fallback)")
-            else:
-                print(f"  ❌ 이미지 생성 완전 실패")
-                # 빈 파일은 생성하지 않음 - 유효한 이미지만 추가
+        image_path = output_dir / f"image_{i:02d}.jpg"
+        source = acquire_image(prompt, image_path, cache, parent=parent)
+        if source:
+            return str(image_path), source
+        print(f"  ❌ image_{i:02d}.jpg 생성 완전 실패")
+        return None, None
+    
+    # API 조회와 다운로드를 동시에 진행하고, 결과는 프롬프트 순서대로 모음
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(acquire, enumerate(image_prompts, 1)))
+    
+    # 빈 파일은 생성하지 않음 - 유효한 이미지만 추가
+    image_paths = [path for path, _ in results if path]
+    # fallback 카드는 rawpipe 슬라이드쇼 엔진이 파일을 읽지 않고 텍스트에서 바로 그림 (placeholder 이미지는 제외)
+    title_cards = {
+        path: prompt for (path, source), prompt in zip(results, image_prompts)
+        if source in ("fallback", "cache_fallback")
+    }
+    
+    stats = cache.stats()
+    if parent:
+        parent.set(images=len(image_paths), cache_hits=stats["hits"], cache_misses=stats["misses"])
+    print(f"📦 이미지 캐시: 적중 {stats['hits']} / 미스 {stats['misses']} "
+          f"({stats['bytes'] / 1024 / 1024:.1f}MB / {stats['max_bytes'] / 1024 / 1024:.0f}MB)")
     
     # 메타데이터 업데이트
     metadata["image_paths"] = image_paths
-    save_metadata(metadata)
+    metadata["title_cards"] = title_cards
+    if standalone:
+        save_metadata(metadata)
     
     print(f"✅ 이미지 생성 완료! ({len(image_paths)}개)")
     return image_paths
@@ -1,7 +1,6 @@
 """Whisper를 사용한 자막 생성"""
 import os
 import sys
-import subprocess
 from pathlib import Path
 
 # 프로젝트 루트를 sys.path에 추가
@@ -11,64 +10,107 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from scripts.utils import get_output_dir, load_metadata, get_env_var, save_metadata
+from scripts.timeline import split_sentences, plan_cues, IMAGE_DURATION
+from scripts.tracing import span, traced_run
+from scripts.http_client import get_client
 
 OPENAI_API_KEY = get_env_var("OPENAI_API_KEY", "")
+# 벤치마크/테스트에서 로컬 대체 서버를 쓸 수 있도록 API 주소를 환경 변수로 변경 가능
+OPENAI_API_URL = get_env_var("OPENAI_API_URL", "https://api.openai.com").rstrip("/")
 
+# Whisper에 보낼 음성 트랙: 모노 16kHz 저비트레이트 MP3 (음성 인식에는 충분하고 15초에 수십 KB)
+SPEECH_SAMPLE_RATE = 16000
+SPEECH_BITRATE = "32k"
 
-def generate_subtitle_with_whisper_api(video_path, script_text):
-    """OpenAI Whisper API를 사용한 자막 생성"""
+
+def extract_speech_track(media_path, output_path=None):
+    """미디어에서 Whisper 업로드용 모노 16kHz 음성 트랙을 추출 (원본보다 새로운 결과가 있으면 재사용)"""
+    media_path = Path(media_path)
+    output_path = Path(output_path or media_path.with_name(f"{media_path.stem}_speech16k.mp3"))
+    if output_path.exists() and output_path.stat().st_mtime >= media_path.stat().st_mtime:
+        return str(output_path)
+    
+    tmp_path = output_path.with_name(f".{output_path.name}.part.mp3")
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", str(media_path),
+        "-vn", "-ac", "1", "-ar", str(SPEECH_SAMPLE_RATE),
+        "-c:a", "libmp3lame", "-b:a", SPEECH_BITRATE,
+        str(tmp_path)
+    ]
+    try:
+        result = traced_run(cmd, name="ffmpeg.speech_track")
+        if result.returncode != 0:
+            print(f"⚠️ 음성 트랙 추출 실패: {result.stderr[-300:]}")
+            return None
+        os.replace(tmp_path, output_path)
+        return str(output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def generate_subtitle_with_whisper_api(audio_path):
+    """OpenAI Whisper API로 음성을 전사해 {start, end, text} 큐 목록 반환 (실패 시 None)
+    
+    원본 대신 압축한 음성 트랙만 올리고, 구간(segment) 타임스탬프를 받아 실제 발화 시각을 자막에 쓴다.
+    """
     if not OPENAI_API_KEY:
         print("⚠️ OpenAI API 키가 없습니다. 스크립트 기반 자막을 생성합니다.")
         return None
     
+    speech_path = extract_speech_track(audio_path)
+    if not speech_path:
+        return None
+    
     try:
-        import openai
-        openai.api_key = OPENAI_API_KEY
-        
-        # Whisper API 호출
-        with open(video_path, "rb") as video_file:
-            transcript = openai.Audio.transcribe(
-                model="whisper-1",
-                file=video_file,
-                language="ko"
+        # 재시도 때 다시 보낼 수 있도록 파일 핸들 대신 바이트로 전달 (수십 KB)
+        speech = Path(speech_path).read_bytes()
+        with span("whisper.transcribe", bytes=len(speech)) as s:
+            response = get_client("openai").post(
+                f"{OPENAI_API_URL}/v1/audio/transcriptions",
+                headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
+                data={
+                    "model": "whisper-1",
+                    "language": "ko",
+                    "response_format": "verbose_json",
+                    "timestamp_granularities[]": "segment",
+                },
+                files={"file": (Path(speech_path).name, speech, "audio/mpeg")},
             )
-        
-        return transcript["text"]
-    except ImportError:
-        print("⚠️ openai 라이브러리가 설치되어 있지 않습니다.")
-        return None
+            segments = response.json().get("segments") or []
+            s.set(segments=len(segments))
     except Exception as e:
         print(f"⚠️ Whisper API 오류: {e}")
         return None
+    
+    cues = [
+        {"start": round(float(seg["start"]), 3), "end": round(float(seg["end"]), 3), "text": seg["text"].strip()}
+        for seg in segments if seg.get("text", "").strip()
+    ]
+    return cues or None
 
 
-def generate_subtitle_from_script(script_text, duration):
-    """스크립트 텍스트를 기반으로 자막 생성 (간단한 타이밍)"""
-    output_dir = get_output_dir()
-    subtitle_path = output_dir / "subtitle.srt"
-    
-    # 스크립트를 문장 단위로 분리
-    sentences = [s.strip() for s in script_text.replace(".", ".\n").split("\n") if s.strip()]
+def generate_subtitle_from_script(script_text, duration, subtitle_path=None, cues=None):
+    """스크립트 텍스트를 기반으로 자막 생성
     
-    if not sentences:
-        sentences = [script_text]
+    cues(타임라인에서 계산한 {start, end, text} 목록)가 있으면 그 시각을 그대로 쓰고,
+    없으면 전체 길이를 문장 글자 수에 비례해 나눈다.
+    """
+    if cues is None:
+        cues = plan_cues(split_sentences(script_text), duration)
+    return write_srt(cues, subtitle_path)
+
+
+def write_srt(cues, subtitle_path=None):
+    """자막 큐 목록을 SRT 파일로 저장"""
+    if subtitle_path is None:
+        subtitle_path = get_output_dir() / "subtitle.srt"
     
-    # 각 문장의 예상 길이 계산 (대략 1초에 3자)
     subtitle_entries = []
-    current_time = 0.0
-    
-    for i, sentence in enumerate(sentences):
-        # 문장 길이에 따라 지속 시간 계산
-        estimated_duration = max(2.0, len(sentence) / 3.0)
-        end_time = min(current_time + estimated_duration, duration)
-        
-        # SRT 형식으로 변환
-        start_str = format_srt_time(current_time)
-        end_str = format_srt_time(end_time)
-        
-        subtitle_entries.append(f"{i + 1}\n{start_str} --> {end_str}\n{sentence}\n\n")
-        
-        current_time = end_time + 0.5  # 0.5초 간격
+    for i, cue in enumerate(cues):
+        start_str = format_srt_time(cue["start"])
+        end_str = format_srt_time(cue["end"])
+        subtitle_entries.append(f"{i + 1}\n{start_str} --> {end_str}\n{cue['text']}\n\n")
     
     # SRT 파일 저장
     with open(subtitle_path, "w", encoding="utf-8") as f:
@@ -78,6 +120,31 @@ def generate_subtitle_from_script(script_text, duration):
     return str(subtitle_path)
 
 
+def parse_srt(subtitle_path):
+    """SRT 파일을 {start, end, text} 큐 목록으로 읽음 (write_srt의 역)"""
+    with open(subtitle_path, "r", encoding="utf-8-sig") as f:
+        blocks = f.read().replace("\r\n", "\n").strip().split("\n\n")
+    
+    cues = []
+    for block in blocks:
+        lines = block.strip().split("\n")
+        timing = next((i for i, line in enumerate(lines) if "-->" in line), None)
+        if timing is None:
+            continue
+        start, end = (parse_srt_time(part) for part in lines[timing].split("-->"))
+        text = "\n".join(lines[timing + 1:]).strip()
+        if text:
+            cues.append({"start": start, "end": end, "text": text})
+    return cues
+
+
+def parse_srt_time(value):
+    """SRT 시간 형식(HH:MM:SS,mmm)을 초로 변환"""
+    hours, minutes, rest = value.strip().split(":")
+    secs, millis = rest.replace(".", ",").split(",")
+    return int(hours) * 3600 + int(minutes) * 60 + int(secs) + int(millis) / 1000
+
+
 def format_srt_time(seconds):
     """초를 SRT 시간 형식으로 변환 (HH:MM:SS,mmm)"""
     hours = int(seconds // 3600)
@@ -87,16 +154,21 @@ def format_srt_time(seconds):
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
 
-def generate_subtitle():
+def generate_subtitle(metadata=None):
     """자막 생성"""
-    metadata = load_metadata()
+    standalone = metadata is None
+    if standalone:
+        metadata = load_metadata()
     if not metadata:
         print("❌ 메타데이터를 찾을 수 없습니다.")
         return
     
     script_text = metadata.get("script", "")
-    video_path = metadata.get("video_path", "")
-    duration = metadata.get("video_duration", 15)
+    audio_path = metadata.get("audio_path", "")
+    # 타임라인(음성 길이 기준)이 있으면 그 길이와 자막 큐를 사용하고, 없으면 이미지 개수로 길이 추정
+    timeline = metadata.get("timeline") or {}
+    duration = (timeline.get("duration") or metadata.get("video_duration")
+                or len(metadata.get("image_paths", [])) * IMAGE_DURATION or 15)
     
     if not script_text:
         print("❌ 스크립트가 없습니다.")
@@ -104,22 +176,24 @@ def generate_subtitle():
     
     subtitle_path = None
     
-    # Whisper API 시도 (비디오가 있는 경우)
-    if video_path and Path(video_path).exists() and OPENAI_API_KEY:
+    # Whisper API 시도 (음성 파일이 있는 경우, 슬라이드쇼 영상에는 음성이 없으므로 음성 파일을 전사)
+    if audio_path and Path(audio_path).exists() and OPENAI_API_KEY:
         print("🎤 Whisper API로 자막 생성 시도...")
-        transcript = generate_subtitle_with_whisper_api(video_path, script_text)
-        if transcript:
-            # Whisper 결과를 사용하여 더 정확한 자막 생성
-            subtitle_path = generate_subtitle_from_script(transcript, duration)
+        cues = generate_subtitle_with_whisper_api(audio_path)
+        if cues:
+            # 실제 발화 시각을 사용하되 영상 길이를 넘지 않도록 자름
+            cues = [dict(cue, end=min(cue["end"], duration)) for cue in cues if cue["start"] < duration]
+            subtitle_path = write_srt(cues)
     
     # Whisper 실패 시 스크립트 기반 자막 생성
     if not subtitle_path:
         print("📝 스크립트 기반 자막 생성...")
-        subtitle_path = generate_subtitle_from_script(script_text, duration)
+        subtitle_path = generate_subtitle_from_script(script_text, duration, cues=timeline.get("cues"))
     
     # 메타데이터 업데이트
     metadata["subtitle_path"] = subtitle_path
-    save_metadata(metadata)
+    if standalone:
+        save_metadata(metadata)
     
     return subtitle_path
 
@@ -0,0 +1,206 @@
+"""외부 API 공용 HTTP 클라이언트 (제공자별 연결 풀, 재시도, 요청 수 제한)
+
+제공자(unsplash, image_cdn, elevenlabs, openai)마다 keep-alive 연결 풀을 가진 세션을 하나씩 두고,
+모든 요청에 다음을 적용한다.
+
+- 재시도: 연결 오류, 타임아웃, 429/5xx 응답은 지터를 넣은 지수 백오프(full jitter)로 다시 시도한다.
+  응답에 Retry-After가 있으면 그 시간을 우선한다.
+- 요청 수 제한: 토큰 버킷. 상태를 캐시 디렉토리(<캐시>/ratelimit/<제공자>.json)에 파일 잠금과 함께 저장해
+  한 머신에서 동시에 실행되는 작업끼리 한도를 나눠 쓴다 (Unsplash 데모 키는 시간당 50회).
+  토큰을 기다려야 하는 시간이 max_wait_s를 넘으면 RateLimitError를 내고 호출자의 fallback으로 넘어간다.
+- 지표: 시도마다 http.<제공자> span(상태 코드, 시도 번호, 지연 시간)을 남긴다 (tracing.py 요약 표에 집계).
+
+설정은 config.yaml의 http 섹션(defaults + providers.<제공자>)에서 읽는다.
+
+    client = get_client("unsplash")
+    response = client.get(url, params=params)
+"""
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from scripts.utils import load_config
+from scripts.asset_cache import get_cache_dir
+from scripts.tracing import span
+
+# 재시도할 응답 상태 코드
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULTS = {
+    "timeout": 30,  # 요청당 (연결/읽기) 제한 시간(초)
+    "retries": 3,  # 첫 요청 이후 최대 재시도 횟수
+    "backoff_base": 0.5,  # 첫 재시도 대기 상한(초), 이후 두 배씩 증가
+    "backoff_max": 8.0,  # 재시도 대기 상한(초)
+    "pool_size": 8,  # 연결 풀 크기
+    "rate_per_hour": None,  # 시간당 요청 수 (None이면 제한 없음)
+    "burst": None,  # 버킷 크기 (기본값: rate_per_hour)
+    "max_wait_s": 60,  # 토큰을 기다리는 최대 시간(초)
+}
+
+# 제공자별 기본값 (config.yaml http.providers로 덮어씀)
+PROVIDERS = {
+    "unsplash": {"rate_per_hour": 50},
+    "image_cdn": {"pool_size": 16},
+    "elevenlabs": {"timeout": 60},
+    "openai": {"timeout": 120},
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class RateLimitError(RuntimeError):
+    """요청 수 한도 때문에 max_wait_s 안에 요청을 보낼 수 없음"""
+
+
+def provider_settings(provider):
+    """제공자 설정 (기본값 < 제공자 기본값 < config.yaml http.defaults < http.providers.<제공자>)"""
+    config = (load_config() or {}).get("http") or {}
+    settings = dict(DEFAULTS)
+    settings.update(PROVIDERS.get(provider, {}))
+    settings.update(config.get("defaults") or {})
+    settings.update((config.get("providers") or {}).get(provider) or {})
+    return settings
+
+
+class TokenBucket:
+    """프로세스 간에 공유되는 토큰 버킷 (fcntl이 없는 플랫폼에서는 프로세스 내에서만 공유)"""
+
+    def __init__(self, name, rate_per_hour, burst=None, state_dir=None):
+        self.rate = rate_per_hour / 3600.0
+        self.capacity = float(burst or rate_per_hour)
+        self.state_path = (state_dir or get_cache_dir() / "ratelimit") / f"{name}.json"
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _process_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.state_path.with_suffix(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _take(self):
+        """토큰 하나를 가져가면 0, 부족하면 다음 토큰까지 남은 시간(초)"""
+        with self._lock, self._process_lock():
+            now = time.time()
+            try:
+                state = json.loads(self.state_path.read_text())
+            except (OSError, ValueError):
+                state = {"tokens": self.capacity, "updated": now}
+            tokens = min(self.capacity, state["tokens"] + max(0.0, now - state["updated"]) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            if not wait:
+                tokens -= 1
+            tmp_path = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"tokens": tokens, "updated": now}))
+            os.replace(tmp_path, self.state_path)
+            return wait
+
+    def acquire(self, max_wait):
+        """토큰 하나를 얻을 때까지 대기. 반환값: 기다린 시간(초)"""
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            if waited + wait > max_wait:
+                raise RateLimitError(f"{self.state_path.stem}: 요청 한도 초과 ({wait:.0f}초 후 가능)")
+            time.sleep(wait)
+            waited += wait
+
+
+def backoff_delay(attempt, base, cap, retry_after=None):
+    """attempt번째 재시도 전 대기 시간 (Retry-After 우선, 아니면 full jitter 지수 백오프)"""
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None  # HTTP 날짜 형식은 무시하고 백오프 사용
+
+
+class HttpClient:
+    """제공자 하나의 세션, 토큰 버킷, 재시도 정책"""
+
+    def __init__(self, provider, settings=None):
+        import requests  # 외부 API를 호출하는 단계에서만 로드
+
+        self.provider = provider
+        self.settings = settings or provider_settings(provider)
+        self.session = requests.Session()
+        pool_size = self.settings["pool_size"]
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        rate = self.settings["rate_per_hour"]
+        self.bucket = TokenBucket(provider, rate, self.settings["burst"]) if rate else None
+
+    def request(self, method, url, **kwargs):
+        """재시도와 요청 수 제한을 적용한 요청. 마지막 시도도 실패하면 예외를 던진다 (4xx는 재시도 없이 바로)
+
+        stream=True 응답은 호출자가 본문을 읽는다 (본문을 읽는 도중의 오류는 재시도하지 않음).
+        """
+        import requests
+
+        settings = self.settings
+        kwargs.setdefault("timeout", settings["timeout"])
+        retries = settings["retries"]
+
+        for attempt in range(retries + 1):
+            with span(f"http.{self.provider}", method=method, attempt=attempt) as s:
+                if self.bucket:
+                    waited = self.bucket.acquire(settings["max_wait_s"])
+                    if waited:
+                        s.set(rate_limited_s=round(waited, 3))
+                response = None
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    s.set(status_code=response.status_code)
+                    if response.status_code not in RETRY_STATUSES or attempt == retries:
+                        response.raise_for_status()
+                        if not kwargs.get("stream"):
+                            s.set(bytes=len(response.content))
+                        return response
+                    s.fail(f"HTTP {response.status_code}")
+                    response.close()
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt == retries:
+                        raise
+                    s.fail(f"{type(e).__name__}: {e}")
+
+            delay = backoff_delay(attempt, settings["backoff_base"], settings["backoff_max"], _retry_after(response))
+            print(f"  ↻ {self.provider} 재시도 {attempt + 1}/{retries} ({delay:.1f}초 후)")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+def get_client(provider):
+    """제공자별 클라이언트 반환 (프로세스 내 공유, 스레드 안전)"""
+    with _clients_lock:
+        if provider not in _clients:
+            _clients[provider] = HttpClient(provider)
+        return _clients[provider]
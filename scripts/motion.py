@@ -0,0 +1,123 @@
+"""슬라이드 팬/줌(Ken Burns) 모션
+
+FFmpeg zoompan은 1080x1920에서 프레임마다 전체 해상도로 다시 샘플링해 매우 느리다.
+여기서는 슬라이드마다 한 번만 max_zoom배 크기의 원본(화면을 꽉 채우도록 잘라낸 이미지)을 만들어 두고,
+프레임마다 그 안에서 줌 배율만큼의 창을 잘라 출력 크기로 줄인다 (Image.resize의 box 인자로 자르기+축소 1회).
+프레임은 rawvideo로 FFmpeg stdin에 보낸다 (frame_pipe.py).
+
+궤적은 프리셋 이름(zoom_in, zoom_out, pan_left, pan_right, pan_up, pan_down) 또는
+{"zoom": [시작, 끝], "center": [[x0, y0], [x1, y1]]} 형식(중심 좌표는 0~1 비율)으로 지정한다.
+"""
+import random
+from pathlib import Path
+
+from scripts.utils import load_config, get_env_var
+from scripts.title_card import title_card_image
+
+# static: 정지 슬라이드, kenburns: 슬라이드마다 팬/줌
+MOTION_MODES = ("static", "kenburns")
+DEFAULT_MAX_ZOOM = 1.15
+
+# 프리셋 궤적. zoom은 0(원본 전체)~1(max_zoom배 확대) 사이 비율이고, 실제 배율은 max_zoom에 맞춰 환산한다.
+PRESETS = {
+    "zoom_in": {"zoom": [0.0, 1.0], "center": [[0.5, 0.5], [0.5, 0.5]]},
+    "zoom_out": {"zoom": [1.0, 0.0], "center": [[0.5, 0.5], [0.5, 0.5]]},
+    "pan_left": {"zoom": [1.0, 1.0], "center": [[0.65, 0.5], [0.35, 0.5]]},
+    "pan_right": {"zoom": [1.0, 1.0], "center": [[0.35, 0.5], [0.65, 0.5]]},
+    "pan_up": {"zoom": [1.0, 1.0], "center": [[0.5, 0.65], [0.5, 0.35]]},
+    "pan_down": {"zoom": [1.0, 1.0], "center": [[0.5, 0.35], [0.5, 0.65]]},
+}
+
+
+def motion_settings(metadata=None):
+    """모션 설정 (메타데이터/작업의 motion_mode > 환경 변수 MOTION_MODE > config.yaml motion.mode > static)"""
+    config = (load_config() or {}).get("motion") or {}
+    metadata = metadata or {}
+    mode = metadata.get("motion_mode") or get_env_var("MOTION_MODE", "") or config.get("mode") or "static"
+    if mode not in MOTION_MODES:
+        raise ValueError(f"알 수 없는 모션 모드: {mode} (사용 가능: {', '.join(MOTION_MODES)})")
+    return {
+        "mode": mode,
+        "max_zoom": float(config.get("max_zoom", DEFAULT_MAX_ZOOM)),
+        "trajectories": metadata.get("motion") or config.get("trajectories") or "random",
+        "seed": config.get("seed"),
+    }
+
+
+def plan_trajectories(count, trajectories="random", seed=None):
+    """슬라이드 count개의 궤적 목록
+
+    trajectories가 "random"이면 프리셋 중에서 고르되 연속으로 같은 궤적이 나오지 않게 하고,
+    목록이면 순서대로 반복해서 쓴다 (항목은 프리셋 이름 또는 궤적 dict).
+    """
+    if trajectories == "random":
+        rng = random.Random(seed)
+        names = []
+        for _ in range(count):
+            choices = [name for name in PRESETS if not names or name != names[-1]]
+            names.append(rng.choice(choices))
+        trajectories = names
+
+    planned = []
+    for i in range(count):
+        item = trajectories[i % len(trajectories)]
+        if isinstance(item, str):
+            if item not in PRESETS:
+                raise ValueError(f"알 수 없는 모션 프리셋: {item} (사용 가능: {', '.join(PRESETS)})")
+            item = PRESETS[item]
+        planned.append(item)
+    return planned
+
+
+def oversized_source(image, width, height, max_zoom):
+    """화면 비율로 꽉 채워 자른 max_zoom배 크기 원본 (슬라이드마다 한 번만 생성)"""
+    from PIL import Image, ImageOps
+
+    size = (round(width * max_zoom), round(height * max_zoom))
+    return ImageOps.fit(image.convert("RGB"), size, Image.LANCZOS)
+
+
+def _ease(t):
+    """부드러운 시작/끝 (smoothstep)"""
+    return t * t * (3 - 2 * t)
+
+
+def crop_box(trajectory, t, width, height, max_zoom):
+    """진행률 t(0~1)에서 원본 안의 잘라낼 창 (left, top, right, bottom)"""
+    t = _ease(t)
+    z0, z1 = trajectory["zoom"]
+    (x0, y0), (x1, y1) = trajectory["center"]
+    zoom = 1 + (max_zoom - 1) * (z0 + (z1 - z0) * t)
+
+    # 원본은 출력의 max_zoom배이므로 배율 zoom에서의 창 크기는 출력 * max_zoom / zoom
+    box_w = width * max_zoom / zoom
+    box_h = height * max_zoom / zoom
+    source_w, source_h = width * max_zoom, height * max_zoom
+    cx = (x0 + (x1 - x0) * t) * source_w
+    cy = (y0 + (y1 - y0) * t) * source_h
+    left = min(max(cx - box_w / 2, 0), source_w - box_w)
+    top = min(max(cy - box_h / 2, 0), source_h - box_h)
+    return (left, top, left + box_w, top + box_h)
+
+
+def motion_frames(valid_images, profile, durations, trajectories, max_zoom=DEFAULT_MAX_ZOOM, title_cards=None):
+    """팬/줌이 적용된 프레임 생성기 (frame_pipe.pipe_frames에 넘기는 (데이터, 1) 쌍)"""
+    from PIL import Image
+
+    width, height, fps = profile["width"], profile["height"], profile["fps"]
+    cards = {str(Path(path).absolute()): text for path, text in (title_cards or {}).items()}
+
+    for image_path, duration, trajectory in zip(valid_images, durations, trajectories):
+        key = str(Path(image_path).absolute())
+        if key in cards:
+            source = oversized_source(title_card_image(cards[key], width, height), width, height, max_zoom)
+        else:
+            with Image.open(image_path) as img:
+                source = oversized_source(img, width, height, max_zoom)
+
+        frame_count = max(1, round(duration * fps))
+        for i in range(frame_count):
+            t = i / (frame_count - 1) if frame_count > 1 else 0.0
+            box = crop_box(trajectory, t, width, height, max_zoom)
+            frame = source.resize((width, height), Image.BILINEAR, box=box)
+            yield frame.tobytes(), 1
@@ -0,0 +1,283 @@
+"""단일 프로세스 파이프라인 오케스트레이터
+
+generate_prompt → generate_images / generate_audio → plan_timeline → create_video → generate_subtitle → edit_video
+단계를 하나의 프로세스에서 실행한다. 메타데이터는 메모리에서 공유하고 마지막에 한 번만 저장하며,
+서로 의존하지 않는 단계(예: TTS와 이미지 다운로드/영상 생성)는 스레드로 동시에 실행한다.
+--job-id/--new-job으로 실행하면 작업별 공간(output/jobs/<작업 id>/)을 사용한다 (workspace.py 참고).
+이전 실행의 metadata.json이 있으면 입력과 출력이 바뀌지 않은 단계는 건너뛴다 (freshness.py, --force 단계).
+"""
+import argparse
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+
+# 프로젝트 루트를 sys.path에 추가
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.utils import save_metadata, load_metadata, get_output_dir, get_env_var
+from scripts.freshness import is_fresh, input_fingerprint, record
+from scripts.workspace import (
+    new_job_id, activate_job, job_lock, clean_intermediates, prune_workspaces, workspace_config
+)
+from scripts.tracing import span, start_trace, end_trace
+from scripts.generate_prompt import generate_prompt
+from scripts.generate_image import generate_images
+from scripts.timeline import plan_timeline
+from scripts.create_video import create_video_from_images
+from scripts.generate_subtitle import generate_subtitle
+from scripts.generate_audio import generate_audio
+from scripts.edit_video import edit_video, RENDER_MODE
+
+# 동시에 실행할 최대 단계 수
+MAX_PARALLEL_STAGES = 4
+
+
+# 작업별로 지정할 수 있는 렌더링 옵션 (메타데이터 키)
+RENDER_OPTIONS = ("encoding_profile", "encoding", "motion_mode", "motion", "subtitle_mode")
+
+# 단계별 입력(읽는 메타데이터 키, config.yaml 섹션, 환경 변수)과 출력(쓰는 메타데이터 키). freshness.py 참고
+STAGE_IO = {
+    "generate_prompt": {
+        "writes": ("topic", "image_prompts", "script", "num_images"),
+        "config": ("topics",),
+        "env": ("TOPIC", "TOPIC_CATALOG"),
+        # TOPIC이 없으면 주제를 무작위로 고르므로 실행할 때마다 다시 실행
+        "random_unless": ("TOPIC",),
+    },
+    "generate_images": {
+        "reads": ("image_prompts",),
+        "writes": ("image_paths", "title_cards"),
+        "config": ("image",),
+        "env": ("UNSPLASH_ACCESS_KEY", "UNSPLASH_API_URL"),
+    },
+    "generate_audio": {
+        "reads": ("script",),
+        "writes": ("audio_path", "audio_duration", "sentence_durations"),
+        "config": ("audio",),
+        "env": ("ELEVENLABS_API_KEY", "ELEVENLABS_API_URL"),
+    },
+    "plan_timeline": {
+        "reads": ("script", "image_paths", "image_prompts", "audio_path", "audio_duration",
+                  "sentence_durations", "encoding_profile", "encoding"),
+        "writes": ("timeline",),
+        "config": ("video", "profiles", "output"),
+        "env": ("ENCODING_PROFILE",),
+    },
+    "create_video": {
+        "reads": ("image_paths", "title_cards", "timeline") + RENDER_OPTIONS,
+        "writes": ("video_path",),
+        "config": ("video", "profiles", "output", "motion"),
+        "env": ("ENCODING_PROFILE", "SLIDESHOW_ENGINE", "MOTION_MODE"),
+    },
+    "generate_subtitle": {
+        "reads": ("script", "timeline", "audio_path", "video_duration", "image_paths"),
+        "writes": ("subtitle_path",),
+        "env": ("OPENAI_API_KEY", "OPENAI_API_URL"),
+    },
+    "edit_video": {
+        "reads": ("video_path", "subtitle_path", "audio_path", "image_paths", "title_cards", "timeline",
+                  "video_duration", "renditions", "poster") + RENDER_OPTIONS,
+        "writes": ("final_video_path", "rendition_paths", "poster_path"),
+        "config": ("video", "profiles", "output", "motion", "subtitle", "renditions"),
+        "env": ("ENCODING_PROFILE", "SLIDESHOW_ENGINE", "MOTION_MODE", "SUBTITLE_MODE", "RENDER_MODE",
+                "RENDITIONS", "POSTER"),
+    },
+}
+
+
+@dataclass
+class Stage:
+    """파이프라인 단계: 이름, 실행 함수(metadata를 받음), 선행 단계 이름, 최신 여부 판단용 입력/출력"""
+    name: str
+    func: object
+    deps: tuple = field(default_factory=tuple)
+    reads: tuple = field(default_factory=tuple)
+    writes: tuple = field(default_factory=tuple)
+    config: tuple = field(default_factory=tuple)
+    env: tuple = field(default_factory=tuple)
+    random_unless: tuple = field(default_factory=tuple)  # 모두 비어 있으면 결과가 무작위인 환경 변수 (항상 다시 실행)
+
+
+def _stage(name, func, deps=()):
+    return Stage(name, func, deps, **STAGE_IO.get(name, {}))
+
+
+def build_stages(render_mode=RENDER_MODE):
+    """렌더링 모드에 맞는 단계 DAG 구성
+
+    인코딩 전에 음성 길이를 알아야 하므로 영상/자막 단계는 plan_timeline(이미지 + 음성 이후)에 의존한다.
+    """
+    if render_mode == "single_pass":
+        # create_video 없이 edit_video가 이미지에서 바로 최종 영상을 만든다
+        return [
+            _stage("generate_prompt", generate_prompt),
+            _stage("generate_images", generate_images, ("generate_prompt",)),
+            _stage("generate_audio", generate_audio, ("generate_prompt",)),
+            _stage("plan_timeline", plan_timeline, ("generate_images", "generate_audio")),
+            _stage("generate_subtitle", generate_subtitle, ("plan_timeline",)),
+            _stage("edit_video", edit_video, ("generate_subtitle",)),
+        ]
+
+    return [
+        _stage("generate_prompt", generate_prompt),
+        _stage("generate_images", generate_images, ("generate_prompt",)),
+        _stage("generate_audio", generate_audio, ("generate_prompt",)),
+        _stage("plan_timeline", plan_timeline, ("generate_images", "generate_audio")),
+        _stage("create_video", create_video_from_images, ("plan_timeline",)),
+        _stage("generate_subtitle", generate_subtitle, ("create_video",)),
+        _stage("edit_video", edit_video, ("generate_subtitle",)),
+    ]
+
+
+def _run_stage(stage, metadata, parent, force=False):
+    """단계 하나를 stage.<이름> span으로 감싸 실행
+
+    force가 아니고 입력/출력이 이전 실행과 같으면 건너뛴다 (반환값 "fresh").
+    """
+    with span(f"stage.{stage.name}", parent=parent) as s:
+        if not force and is_fresh(stage, metadata):
+            s.set(skipped=True)
+            return "fresh"
+        inputs = input_fingerprint(stage, metadata)
+        result = stage.func(metadata)
+        if result:
+            record(stage, metadata, inputs)
+        else:
+            s.fail("결과 없음")
+        return result
+
+
+def run_pipeline(stages=None, metadata=None, max_workers=MAX_PARALLEL_STAGES, force=()):
+    """의존성이 충족된 단계부터 동시에 실행
+
+    각 단계 함수는 공유 metadata dict를 직접 갱신하며, 결과가 비어 있으면 실패로 본다.
+    실패한 단계에 의존하는 단계는 실행하지 않는다.
+    metadata를 생략하면 이전 실행의 metadata.json을 읽어, 입력과 출력이 바뀌지 않은 단계는 건너뛴다.
+    force에 든 단계("all"이면 전부)는 항상 다시 실행한다.
+    단계와 외부 호출은 output/trace.jsonl에 span으로 기록되고, 끝나면 요약 표를 출력한다.
+    """
+    stages = stages or build_stages()
+    metadata = load_metadata() if metadata is None else metadata
+
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in by_name]
+        if missing:
+            raise ValueError(f"{stage.name}: 알 수 없는 선행 단계 {missing}")
+    unknown = [name for name in force if name != "all" and name not in by_name]
+    if unknown:
+        raise ValueError(f"알 수 없는 단계 (--force): {unknown}")
+
+    pending = dict(by_name)
+    done = set()
+    failed = set()
+    running = {}
+    timings = {}
+    started_at = time.perf_counter()
+
+    print(f"🚀 파이프라인 시작 ({len(stages)}단계, 최대 {max_workers}개 동시 실행)")
+
+    trace_id = start_trace(get_output_dir() / "trace.jsonl")
+    with span("pipeline", stages=len(stages)) as root, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # 선행 단계가 실패한 단계는 건너뜀
+            for name, stage in list(pending.items()):
+                if any(dep in failed for dep in stage.deps):
+                    print(f"⏭️ {name} 건너뜀 (선행 단계 실패)")
+                    failed.add(name)
+                    del pending[name]
+
+            # 준비된 단계 제출
+            for name, stage in list(pending.items()):
+                if all(dep in done for dep in stage.deps):
+                    print(f"▶️ {name} 시작")
+                    future = executor.submit(_run_stage, stage, metadata, root, "all" in force or name in force)
+                    running[future] = (name, time.perf_counter())
+                    del pending[name]
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, stage_start = running.pop(future)
+                timings[name] = time.perf_counter() - stage_start
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {name} 오류: {e}")
+                    result = None
+
+                if result == "fresh":
+                    done.add(name)
+                    print(f"⏭️ {name} 최신 상태, 건너뜀")
+                elif result:
+                    done.add(name)
+                    print(f"⏹️ {name} 완료 ({timings[name]:.1f}s)")
+                else:
+                    failed.add(name)
+                    print(f"❌ {name} 실패 ({timings[name]:.1f}s)")
+
+        if failed:
+            root.fail(f"실패한 단계: {', '.join(sorted(failed))}")
+
+    # 메타데이터는 모든 단계가 끝난 뒤 한 번만 저장
+    metadata["trace_id"] = trace_id
+    save_metadata(metadata)
+
+    end_trace()
+    print(f"  전체 {time.perf_counter() - started_at:.1f}s")
+
+    if failed:
+        print(f"❌ 파이프라인 실패: {', '.join(sorted(failed))}")
+        return None
+
+    print("🎉 파이프라인 완료!")
+    return metadata
+
+
+def run_job(job_id=None, stages=None, force=()):
+    """작업 공간(<출력 루트>/jobs/<작업 id>/)을 잠그고 그 안에서 파이프라인 실행
+
+    성공하면 workspace.clean_intermediates 설정에 따라 중간 파일을 지우고,
+    끝나면 보관 정책(workspace.retention_days, keep_last)에 따라 오래된 작업 공간을 정리한다.
+    """
+    job_id = job_id or new_job_id()
+    job_dir = activate_job(job_id)
+    print(f"📂 작업 공간: {job_dir}")
+
+    with job_lock(job_dir):
+        metadata = load_metadata()
+        metadata["job_id"] = job_id
+        result = run_pipeline(stages, metadata=metadata, force=force)
+        if result and workspace_config()["clean_intermediates"]:
+            freed = clean_intermediates(job_dir)
+            print(f"🧹 중간 파일 정리 ({freed / 1024 / 1024:.1f}MB)")
+
+    removed = prune_workspaces()
+    if removed:
+        print(f"🗑️ 오래된 작업 공간 {len(removed)}개 삭제")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="숏츠 파이프라인 실행")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--job-id", default=None, help="이 id의 작업 공간(output/jobs/<id>/)에서 실행")
+    group.add_argument("--new-job", action="store_true", help="새 작업 id를 만들어 격리된 작업 공간에서 실행")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="최신 상태여도 다시 실행할 단계 (여러 번 지정 가능, all이면 전체)")
+    args = parser.parse_args()
+
+    job_id = args.job_id or get_env_var("AUTOVIDEO_JOB_ID", "")
+    if job_id or args.new_job:
+        result = run_job(job_id or None, force=args.force)
+    else:
+        result = run_pipeline(force=args.force)
+    if not result:
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""여러 해상도/비트레이트 출력과 포스터 프레임 (한 번의 디코드 → N개 인코딩)
+
+최종 영상(마스터) 외에 추가 렌디션(예: 720x1280 저비트레이트 사본, 몇 초짜리 미리보기)과 포스터 JPEG를
+같은 FFmpeg 실행에서 만든다. 최종 필터 그래프 출력(자막까지 합성된 영상)을 split으로 나눠
+렌디션마다 scale/fps만 적용하고 출력별 인코더 인자로 인코딩한다.
+
+렌디션 스펙은 메타데이터/작업의 renditions > 환경 변수 RENDITIONS(JSON 목록) > config.yaml renditions.outputs
+순으로 읽는다. 기본 설정은 추가 렌디션/포스터 없이 마스터만 만든다.
+
+    {"name": "720p", "width": 720, "height": 1280, "crf": 26, "maxrate": "2M", "audio_bitrate": "128k"}
+    {"name": "preview", "profile": "draft", "duration": 5}
+
+name 외의 키는 인코딩 프로필 값(width, height, fps, preset, crf, audio_bitrate 등)이며,
+profile을 주면 그 프로필을, 없으면 마스터 프로필을 바탕으로 덮어쓴다. duration(초)을 주면 앞부분만 인코딩한다.
+maxrate를 주면 VBV 상한(bufsize 기본값: maxrate의 두 배)을 건다. 결과 파일은 final_shorts_<이름>.mp4다.
+"""
+import json
+import re
+
+from scripts.utils import load_config, get_env_var
+from scripts.encoding import resolve_profile, video_codec_args, audio_codec_args
+
+DEFAULT_POSTER_TIME = 1.0
+POSTER_FILENAME = "poster.jpg"
+POSTER_QUALITY = 3  # mjpeg -q:v (2~31, 낮을수록 고화질)
+
+RENDITION_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _env_json(name):
+    """JSON 값을 담은 환경 변수 (비어 있으면 None)"""
+    value = get_env_var(name, "")
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        raise ValueError(f"환경 변수 {name}은(는) JSON이어야 합니다: {value!r}")
+
+
+def resolve_renditions(metadata, profile):
+    """추가 렌디션 목록 (마스터 제외). 각 항목: name, profile, duration, filename"""
+    config = (load_config() or {}).get("renditions") or {}
+    specs = (metadata or {}).get("renditions")
+    if specs is None:
+        specs = _env_json("RENDITIONS")
+    if specs is None:
+        specs = config.get("outputs") or []
+
+    renditions = []
+    for spec in specs:
+        spec = dict(spec)
+        name = str(spec.pop("name", ""))
+        if not RENDITION_NAME.match(name) or name == "master":
+            raise ValueError(f"잘못된 렌디션 이름: {name!r} (영문/숫자/-/_, master 제외)")
+        if any(item["name"] == name for item in renditions):
+            raise ValueError(f"중복된 렌디션 이름: {name}")
+        duration = spec.pop("duration", None)
+        base = spec.pop("profile", None)
+        if base:
+            rendition_profile = resolve_profile(base, spec)
+        else:
+            rendition_profile = dict(profile)
+            rendition_profile.update(spec)
+        renditions.append({
+            "name": name,
+            "profile": rendition_profile,
+            "duration": float(duration) if duration else None,
+            "filename": f"final_shorts_{name}.mp4",
+        })
+    return renditions
+
+
+def poster_settings(metadata, duration=None):
+    """포스터 설정 (메타데이터/작업의 poster > 환경 변수 POSTER(JSON) > config.yaml renditions.poster). 끄면 None
+
+    time은 추출할 시각(초), width는 포스터 폭(생략하면 마스터 폭, 높이는 비율 유지)이다.
+    true를 주면 config.yaml의 time/width로 켠다.
+    duration(영상 길이)을 주면 그보다 늦은 time은 영상 중간으로 당긴다 (프레임이 없으면 포스터가 안 만들어짐).
+    """
+    config = (load_config() or {}).get("renditions") or {}
+    poster = (metadata or {}).get("poster")
+    if poster is None:
+        poster = _env_json("POSTER")
+    if poster is None:
+        poster = config.get("poster")
+    elif poster is True:
+        poster = dict(config.get("poster") or {}, enabled=True)
+    if not poster or (isinstance(poster, dict) and not poster.get("enabled", True)):
+        return None
+    poster = poster if isinstance(poster, dict) else {}
+    time = float(poster.get("time", DEFAULT_POSTER_TIME))
+    if duration and time >= duration:
+        time = duration / 2
+    return {"time": time, "width": poster.get("width")}
+
+
+def rendition_paths(output_dir, renditions, poster):
+    """출력 경로 {렌디션 이름: 경로}와 포스터 경로 (없으면 None)"""
+    paths = {rendition["name"]: str(output_dir / rendition["filename"]) for rendition in renditions}
+    return paths, (str(output_dir / POSTER_FILENAME) if poster else None)
+
+
+def build_rendition_graph(video_label, profile, renditions, poster, include_master=True):
+    """최종 영상 라벨을 split해 마스터/렌디션/포스터 라벨로 나누는 필터
+
+    include_master=False면 마스터 가지 없이 렌디션/포스터로만 나눈다 (마스터가 이미 있는 two_pass 모드).
+    반환값: (filter_complex에 이어 붙일 문자열(';'로 시작, 나눌 필요가 없으면 빈 문자열),
+             마스터 라벨(include_master=False면 None), [(렌디션 라벨, 렌디션)], 포스터 라벨 또는 None)
+    """
+    first = 1 if include_master else 0
+    count = first + len(renditions) + (1 if poster else 0)
+    if count == 0:
+        return "", None, [], None
+    if count == 1 and include_master:
+        return "", video_label, [], None
+
+    labels = [f"[rend{i}]" for i in range(count)]
+    if count == 1:
+        filters = [f"{video_label}null{labels[0]}"]  # 출력 하나면 나눌 필요 없이 라벨만 붙임
+    else:
+        filters = [f"{video_label}split={count}{''.join(labels)}"]
+
+    outputs = []
+    for i, rendition in enumerate(renditions, first):
+        target = rendition["profile"]
+        chain = []
+        if (target["width"], target["height"]) != (profile["width"], profile["height"]):
+            chain.append(f"scale={target['width']}:{target['height']}:flags=bicubic,setsar=1")
+        if target["fps"] != profile["fps"]:
+            chain.append(f"fps={target['fps']}")
+        label = labels[i]
+        if chain:
+            filters.append(f"{label}{','.join(chain)}[rend{i}s]")
+            label = f"[rend{i}s]"
+        outputs.append((label, rendition))
+
+    poster_label = None
+    if poster:
+        width = poster["width"] or profile["width"]
+        filters.append(f"{labels[-1]}select='gte(t,{poster['time']:.3f})',scale={width}:-2[poster]")
+        poster_label = "[poster]"
+
+    return ";" + ";".join(filters), labels[0] if include_master else None, outputs, poster_label
+
+
+def rendition_output_args(label, rendition, output_dir, audio_map=None, subtitle_args=()):
+    """렌디션 하나의 출력 인자 (-map ... 출력 경로)"""
+    target = rendition["profile"]
+    args = ["-map", label]
+    if audio_map:
+        args += ["-map", audio_map, *audio_codec_args(target), "-shortest"]
+    args += [*subtitle_args, *video_codec_args(target)]
+    if target.get("maxrate"):
+        bufsize = target.get("bufsize") or _double_rate(target["maxrate"])
+        args += ["-maxrate", str(target["maxrate"]), "-bufsize", str(bufsize)]
+    if rendition["duration"]:
+        args += ["-t", f"{rendition['duration']:.3f}"]
+    return args + [str(output_dir / rendition["filename"])]
+
+
+def poster_output_args(label, output_dir):
+    """포스터 JPEG 출력 인자 (조건을 만족하는 첫 프레임 한 장)"""
+    return ["-map", label, "-frames:v", "1", "-q:v", str(POSTER_QUALITY), "-update", "1",
+            str(output_dir / POSTER_FILENAME)]
+
+
+def _double_rate(rate):
+    """"2M" → "4M", 2000000 → 4000000"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([kKmM]?)", str(rate))
+    if not match:
+        return rate
+    value = float(match.group(1)) * 2
+    return f"{value:g}{match.group(2)}"
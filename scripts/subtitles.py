@@ -0,0 +1,147 @@
+"""자막 렌더링 모드 (burn / overlay / soft)
+
+- burn: libass(subtitles 필터)로 번인. 폰트는 폰트 인덱스(title_card.py)에서 찾은 파일을 fontsdir로 넘긴다.
+- overlay: 자막 큐마다 투명 PNG를 한 번만 그려 캐시(.cache/autovideo/subtitles/)하고,
+  본 인코딩에서 시간 구간(enable=between)을 건 overlay 필터로 합성한다. 키는 (텍스트, 스타일, 크기)다.
+- soft: subtitle.srt를 mov_text 자막 트랙으로 넣고 영상/음성은 스트림 복사 (재인코딩 없음).
+  플레이어가 자막을 켜야 보이며, 플랫폼에 따라 표시되지 않을 수 있다.
+
+모드 우선순위: 메타데이터/작업의 subtitle_mode > 환경 변수 SUBTITLE_MODE > config.yaml subtitle.mode > burn
+"""
+import io
+import os
+import shutil
+from pathlib import Path
+
+from scripts.utils import load_config, get_env_var
+from scripts.asset_cache import get_cache
+from scripts.generate_subtitle import parse_srt
+from scripts.title_card import find_font_path, load_font, text_width, wrap_text
+
+SUBTITLE_MODES = ("burn", "overlay", "soft")
+DEFAULT_SUBTITLE_MODE = "burn"
+
+# SRT를 libass로 번인할 때의 기준 세로 해상도. 설정값(font_size, margin_bottom)은 이 좌표계 기준이다.
+ASS_PLAY_RES_Y = 288
+
+# 그림 방식이 바뀌면 캐시 키도 바뀌도록 버전을 둠
+OVERLAY_VERSION = "png-v1"
+
+
+def resolve_subtitle_mode(metadata=None):
+    """사용할 자막 모드"""
+    config = (load_config() or {}).get("subtitle") or {}
+    mode = ((metadata or {}).get("subtitle_mode") or get_env_var("SUBTITLE_MODE", "")
+            or config.get("mode") or DEFAULT_SUBTITLE_MODE)
+    if mode not in SUBTITLE_MODES:
+        raise ValueError(f"알 수 없는 자막 모드: {mode} (사용 가능: {', '.join(SUBTITLE_MODES)})")
+    return mode
+
+
+def subtitle_style(profile):
+    """config.yaml subtitle 섹션을 출력 해상도의 픽셀 단위로 환산한 스타일"""
+    config = (load_config() or {}).get("subtitle") or {}
+    scale = profile["height"] / ASS_PLAY_RES_Y
+    font_path = find_font_path()
+    return {
+        "font": os.path.basename(font_path) if font_path else "default",
+        "font_size": round(config.get("font_size", 24) * scale),
+        "margin": round(config.get("margin_bottom", 100) * scale),
+        "outline": max(1, round(2 * scale)),
+        "position": config.get("position", "bottom"),
+    }
+
+
+def burn_filter(subtitle_path):
+    """libass 번인 필터 (폰트 인덱스의 폰트 파일을 fontsdir로 지정)"""
+    config = (load_config() or {}).get("subtitle") or {}
+    font_path = find_font_path()
+    force_style = (
+        f"FontSize={config.get('font_size', 24)},"
+        "PrimaryColour=&Hffffff,"
+        "OutlineColour=&H000000,"
+        "Outline=2,"
+        "Shadow=1,"
+        "Alignment=2,"  # 하단 중앙
+        f"MarginV={config.get('margin_bottom', 100)}"
+    )
+    if not font_path:
+        return f"subtitles={subtitle_path}:force_style='{force_style}'"
+    family = load_font(font_path, 24).getname()[0]
+    return (f"subtitles={subtitle_path}:fontsdir={os.path.dirname(font_path)}"
+            f":force_style='FontName={family},{force_style}'")
+
+
+def render_cue_image(text, style, width):
+    """자막 큐 하나를 투명 PNG로 그려 캐시하고 캐시 내 경로 반환 (이미 있으면 그대로 반환)"""
+    from PIL import Image, ImageDraw
+
+    cache = get_cache("subtitles")
+    key = cache.make_key(text=text, style=style, width=width, version=OVERLAY_VERSION)
+    cached = cache.get(key)
+    if cached:
+        return cached
+
+    font_path = find_font_path()
+    size = style["font_size"]
+    font = load_font(font_path, size)
+    outline = style["outline"]
+    max_width = int(width * 0.9)
+    lines = [line for paragraph in text.split("\n") for line in wrap_text(paragraph, font_path, size, max_width)]
+    line_height = round(size * 1.25)
+    line_widths = [text_width(font_path, size, line) for line in lines]
+
+    img = Image.new("RGBA", (int(max(line_widths)) + outline * 2, line_height * len(lines) + outline * 2), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for i, (line, line_width) in enumerate(zip(lines, line_widths)):
+        x = (img.width - int(line_width)) // 2
+        draw.text((x, outline + i * line_height), line, font=font, fill=(255, 255, 255, 255),
+                  stroke_width=outline, stroke_fill=(0, 0, 0, 255))
+
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return cache.put_bytes(key, buffer.getvalue(), suffix=".png", meta={"text": text})
+
+
+def build_overlay_graph(subtitle_path, video_label, first_input, profile, work_dir):
+    """overlay 모드: 큐별 PNG 입력과 시간 구간 overlay 체인 구성
+
+    first_input은 PNG 입력이 시작될 입력 번호다. PNG는 work_dir로 복사(가능하면 하드링크)해
+    인코딩 도중 캐시 정리가 일어나도 안전하게 한다.
+    반환값: (추가 입력 인자, filter_complex에 이어 붙일 문자열(';'로 시작), 출력 라벨)
+    """
+    cues = parse_srt(subtitle_path)
+    if not cues:
+        return [], "", video_label
+
+    style = subtitle_style(profile)
+    if style["position"] == "top":
+        y = str(style["margin"])
+    elif style["position"] == "center":
+        y = "(H-h)/2"
+    else:
+        y = f"H-h-{style['margin']}"
+
+    inputs = []
+    filters = []
+    label = video_label
+    for i, cue in enumerate(cues):
+        png_path = Path(work_dir) / f"subtitle_{i:04d}.png"
+        cached = render_cue_image(cue["text"], style, profile["width"])
+        try:
+            os.link(cached, png_path)
+        except OSError:
+            shutil.copyfile(cached, png_path)
+        inputs.extend(["-i", str(png_path)])
+        output = "[vsub]" if i == len(cues) - 1 else f"[sub{i}]"
+        filters.append(
+            f"{label}[{first_input + i}:v]overlay=x=(W-w)/2:y={y}"
+            f":enable='between(t,{cue['start']:.3f},{cue['end']:.3f})'{output}"
+        )
+        label = output
+    return inputs, ";" + ";".join(filters), "[vsub]"
+
+
+def soft_subtitle_args(input_index):
+    """soft 모드: 자막 입력을 mov_text 트랙으로 매핑하는 출력 인자"""
+    return ["-map", f"{input_index}:s:0", "-c:s", "mov_text", "-metadata:s:s:0", "language=kor"]
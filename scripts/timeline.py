@@ -0,0 +1,148 @@
+"""음성 길이 기반 타임라인 계획
+
+TTS 결과의 실제 길이(가능하면 문장별 길이)를 측정해 인코딩 전에
+슬라이드별 표시 시간과 자막 큐 시각을 정한다. 슬라이드 길이는 프레임 단위로 맞춰
+모든 슬라이드의 프레임 수 합이 음성 길이와 같아지므로, 잘려 나갈 프레임을 인코딩하지 않는다.
+"""
+import re
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.utils import load_metadata, save_metadata, probe_duration
+from scripts.encoding import resolve_profile
+
+# 음성 길이를 알 수 없을 때 사용하는 이미지당 표시 시간 (초)
+IMAGE_DURATION = 3
+
+# 문장 끝 (마침표/물음표/느낌표 뒤 공백 또는 줄바꿈)
+SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def split_sentences(text):
+    """스크립트를 문장 단위로 분리 (자막 큐와 문장별 TTS가 같은 단위를 사용)"""
+    sentences = [s.strip() for s in SENTENCE_END.split(text or "") if s and s.strip()]
+    return sentences or ([text.strip()] if text and text.strip() else [])
+
+
+def split_duration(total, count, fps):
+    """전체 길이를 count개 슬라이드로 나누되 각 길이를 프레임 경계에 맞춤
+
+    앞쪽 슬라이드부터 남는 프레임을 한 개씩 더 배정해 프레임 수 합이 round(total * fps)와 같다.
+    """
+    if count <= 0:
+        return []
+    total_frames = max(count, round(total * fps))
+    base, extra = divmod(total_frames, count)
+    return [(base + (1 if i < extra else 0)) / fps for i in range(count)]
+
+
+def plan_cues(sentences, total, sentence_durations=None):
+    """자막 큐 계산
+
+    문장별 음성 길이가 모두 있으면 그대로 이어 붙이고(전체 길이에 맞게 비례 보정),
+    없거나 하나라도 빠졌으면(None, 0 이하) 전체 길이를 문장 글자 수에 비례해 나눈다.
+    """
+    if not sentences:
+        return []
+
+    if (sentence_durations and len(sentence_durations) == len(sentences)
+            and all(isinstance(duration, (int, float)) and duration > 0 for duration in sentence_durations)):
+        weights = list(sentence_durations)
+    else:
+        weights = [max(1, len(sentence)) for sentence in sentences]
+
+    scale = total / sum(weights)
+    cues = []
+    start = 0.0
+    for sentence, weight in zip(sentences, weights):
+        end = min(total, start + weight * scale)
+        cues.append({"start": round(start, 3), "end": round(end, 3), "text": sentence})
+        start = end
+    return cues
+
+
+def build_timeline(script_text, num_slides, fps, audio_duration=None, sentence_durations=None):
+    """타임라인 dict 생성 (duration, fps, slide_durations, cues, source)"""
+    if audio_duration:
+        total, source = float(audio_duration), "audio"
+    else:
+        total, source = float(num_slides * IMAGE_DURATION), "default"
+
+    slide_durations = split_duration(total, num_slides, fps)
+    # 프레임 경계에 맞춘 실제 영상 길이
+    total = sum(slide_durations) if slide_durations else total
+    return {
+        "duration": round(total, 3),
+        "fps": fps,
+        "source": source,
+        "slide_durations": slide_durations,
+        "cues": plan_cues(split_sentences(script_text), total, sentence_durations),
+    }
+
+
+def slide_durations_for(metadata, count, fps):
+    """metadata의 타임라인에서 슬라이드 count개의 길이 목록을 가져옴
+
+    유효한 이미지 수나 fps가 계획 때와 다르면 같은 전체 길이로 다시 나누고,
+    타임라인이 없으면 이미지당 IMAGE_DURATION을 사용한다.
+    """
+    timeline = (metadata or {}).get("timeline")
+    if not timeline:
+        return [IMAGE_DURATION] * count
+    durations = timeline.get("slide_durations") or []
+    if len(durations) == count and timeline.get("fps") == fps:
+        return durations
+    return split_duration(timeline["duration"], count, fps)
+
+
+def plan_timeline(metadata=None):
+    """음성 길이를 측정해 슬라이드 길이와 자막 큐를 계획 (인코딩 전에 실행)"""
+    standalone = metadata is None
+    if standalone:
+        metadata = load_metadata()
+    if not metadata:
+        print("❌ 메타데이터를 찾을 수 없습니다.")
+        return
+
+    num_slides = len(metadata.get("image_paths") or metadata.get("image_prompts") or [])
+    if not num_slides:
+        print("❌ 이미지 정보가 없습니다.")
+        return
+
+    audio_duration = metadata.get("audio_duration")
+    audio_path = metadata.get("audio_path")
+    if not audio_duration and audio_path and os.path.exists(audio_path):
+        audio_duration = probe_duration(audio_path)
+    if not audio_duration:
+        print(f"⚠️ 음성 길이를 알 수 없습니다. 이미지당 {IMAGE_DURATION}초로 계획합니다.")
+
+    profile = resolve_profile(metadata.get("encoding_profile"), metadata.get("encoding"))
+    timeline = build_timeline(
+        metadata.get("script", ""),
+        num_slides,
+        profile["fps"],
+        audio_duration=audio_duration,
+        sentence_durations=metadata.get("sentence_durations"),
+    )
+
+    metadata["timeline"] = timeline
+    metadata["video_duration"] = timeline["duration"]
+    if standalone:
+        save_metadata(metadata)
+
+    print(f"🕒 타임라인: {timeline['duration']:.2f}초, 슬라이드 {num_slides}개 "
+          f"(평균 {timeline['duration'] / num_slides:.2f}초), 자막 {len(timeline['cues'])}개")
+    return timeline
+
+
+if __name__ == "__main__":
+    result = plan_timeline()
+    if not result:
+        print("❌ 타임라인 계획 실패!")
+        sys.exit(1)
@@ -0,0 +1,325 @@
+"""fallback 타이틀 카드 렌더러 (FFmpeg 없이 프로세스 안에서 렌더링)
+
+이미지 다운로드가 실패했을 때 쓰는 텍스트 카드를 만든다.
+- 폰트 인덱스: 시스템 폰트 디렉토리를 한 번만 훑어 캐시 디렉토리의 fonts/index.json에 저장하고,
+  디렉토리 수정 시각이 바뀌었을 때만 다시 만든다.
+- 폰트 객체와 단어 폭 측정 결과는 프로세스 안에서 메모이즈한다 (줄바꿈할 때 단어마다 한 번만 측정).
+- 배경 그라데이션은 크기별로 한 번만 만들고 카드마다 복사해서 쓴다 (NumPy가 있으면 NumPy로 생성).
+
+여러 카드를 한 번에 만들 때는 render_title_cards()를, 파일 없이 프레임으로 바로 쓸 때는
+title_card_image()를 쓴다.
+
+사용법:
+    python scripts/title_card.py "첫 번째 카드" "두 번째 카드" --output-dir output/cards
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.asset_cache import get_cache_dir
+from scripts.tracing import span
+
+# Pillow/NumPy는 카드를 실제로 그릴 때만 import한다 (여기서는 설치 여부만 확인)
+HAS_PIL = importlib.util.find_spec("PIL") is not None
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+FONT_DIRS = [
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/System/Library/Fonts",
+    "/Library/Fonts",
+    "C:/Windows/Fonts",
+]
+FONT_EXTENSIONS = (".ttf", ".ttc", ".otf")
+
+# 앞에 있을수록 우선 (한글 글리프가 있는 폰트 먼저). 한글을 실제로 그릴 수 있는 폰트만 고른다
+PREFERRED_FONTS = [
+    "NanumGothicBold.ttf",
+    "NanumGothic.ttf",
+    "NotoSansCJK-Bold.ttc",
+    "NotoSansCJK-Regular.ttc",
+    "NotoSansKR-Bold.otf",
+    "AppleSDGothicNeo.ttc",
+    "malgunbd.ttf",
+    "DejaVuSans-Bold.ttf",
+    "LiberationSans-Bold.ttf",
+    "Helvetica.ttc",
+    "Arial.ttf",
+]
+
+# 한글 글리프 확인용 글자와 어떤 폰트에도 없는 글자 (.notdef 상자와 비교)
+HANGUL_PROBE = "한"
+MISSING_PROBE = "\U0010fffd"
+
+FONT_SIZE = 60
+LINE_HEIGHT = 80
+SIDE_MARGIN = 50
+GRADIENT_TOP = (40, 40, 70)
+GRADIENT_BOTTOM = (15, 15, 30)
+JPEG_QUALITY = 85
+
+_index_lock = threading.Lock()
+_font_index = None
+_font_path = ()  # find_font_path() 결과 (아직 고르지 않았으면 빈 튜플)
+
+
+def _font_dirs_signature():
+    """폰트 디렉토리와 그 하위 디렉토리별 수정 시각 (인덱스 재생성 여부 판단용)
+
+    기존 하위 디렉토리(예: truetype/nanum/)에 폰트가 추가돼도 최상위 디렉토리의 수정 시각은 바뀌지 않으므로
+    _scan_fonts()가 훑는 디렉토리를 모두 포함한다. 파일은 열지 않고 디렉토리 stat만 한다.
+    """
+    signature = {}
+    for font_dir in FONT_DIRS:
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, _ in os.walk(font_dir):
+            try:
+                signature[root] = os.path.getmtime(root)
+            except OSError:
+                pass
+    return signature
+
+
+def _scan_fonts():
+    """폰트 디렉토리를 훑어 파일 이름 → 경로 dict 생성"""
+    fonts = {}
+    for font_dir in FONT_DIRS:
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, files in os.walk(font_dir):
+            for name in sorted(files):
+                if name.lower().endswith(FONT_EXTENSIONS):
+                    fonts.setdefault(name, os.path.join(root, name))
+    return fonts
+
+
+def get_font_index():
+    """폰트 인덱스 반환 (디스크 캐시 → 없거나 오래됐으면 다시 스캔)"""
+    global _font_index
+    with _index_lock:
+        if _font_index is not None:
+            return _font_index
+
+        index_path = get_cache_dir() / "fonts" / "index.json"
+        signature = _font_dirs_signature()
+        if index_path.exists():
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if cached.get("signature") == signature:
+                    _font_index = cached["fonts"]
+                    return _font_index
+            except (OSError, ValueError, KeyError):
+                pass
+
+        with span("fonts.scan") as s:
+            _font_index = _scan_fonts()
+            s.set(fonts=len(_font_index))
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=index_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"signature": signature, "fonts": _font_index}, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return _font_index
+
+
+def has_hangul(font_path):
+    """폰트가 한글 글리프를 갖고 있는지 (빈 마스크나 .notdef 상자가 아닌지). Pillow가 없으면 확인하지 않고 True"""
+    if not HAS_PIL:
+        return True
+    from PIL import ImageFont
+
+    try:
+        font = ImageFont.truetype(font_path, FONT_SIZE)
+        mask = font.getmask(HANGUL_PROBE)
+    except OSError:
+        return False
+    if not mask.getbbox():
+        return False
+    return bytes(mask) != bytes(font.getmask(MISSING_PROBE))
+
+
+def find_font_path():
+    """한글을 그릴 수 있는 폰트 경로 선택 (선호 목록 → 인덱스 순서, 프로세스 안에서 한 번만)
+
+    한글 폰트가 하나도 없으면 경고 후 선호 목록/인덱스의 첫 폰트, 그마저 없으면 None.
+    """
+    global _font_path
+    with _index_lock:
+        if _font_path != ():
+            return _font_path
+
+    fonts = get_font_index()
+    candidates = [fonts[name] for name in PREFERRED_FONTS if name in fonts]
+    candidates += [path for name, path in fonts.items() if name not in PREFERRED_FONTS]
+    candidates = [path for path in candidates if os.path.exists(path)]
+
+    selected = next((path for path in candidates if has_hangul(path)), None)
+    if selected is None and candidates:
+        selected = candidates[0]
+        print(f"  ⚠️ 한글 글리프가 있는 폰트가 없습니다 (fonts-nanum 설치 권장). 사용: {selected}")
+    with _index_lock:
+        _font_path = selected
+    return selected
+
+
+@lru_cache(maxsize=16)
+def load_font(font_path, size):
+    """폰트 객체 (경로, 크기별로 한 번만 로드). 경로가 None이면 Pillow 기본 폰트"""
+    from PIL import ImageFont
+
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except OSError:
+            print(f"  ⚠️ 폰트 로드 실패, 기본 폰트 사용: {font_path}")
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def text_width(font_path, size, text):
+    """텍스트 폭(px) 측정 결과 메모이즈"""
+    return load_font(font_path, size).getlength(text)
+
+
+def wrap_text(text, font_path, size, max_width):
+    """단어 단위 줄바꿈. 단어 폭과 공백 폭만 측정해서 줄 폭을 합산한다"""
+    space = text_width(font_path, size, " ")
+    lines = []
+    current, current_width = [], 0.0
+    for word in text.split():
+        word_width = text_width(font_path, size, word)
+        candidate = current_width + (space if current else 0) + word_width
+        if current and candidate > max_width:
+            lines.append(" ".join(current))
+            current, current_width = [word], word_width
+        else:
+            current.append(word)
+            current_width = candidate
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+@lru_cache(maxsize=4)
+def _background(width, height):
+    """세로 그라데이션 배경 (크기별로 한 번만 생성)"""
+    from PIL import Image
+
+    if HAS_NUMPY:
+        import numpy as np
+
+        ramp = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None, None]
+        top = np.array(GRADIENT_TOP, dtype=np.float32)
+        bottom = np.array(GRADIENT_BOTTOM, dtype=np.float32)
+        column = (top + (bottom - top) * ramp).astype(np.uint8)
+        return Image.fromarray(np.broadcast_to(column, (height, width, 3)).copy(), "RGB")
+
+    # NumPy가 없으면 1픽셀 폭 그라데이션을 만들어 가로로 늘림
+    column = Image.new("RGB", (1, height))
+    column.putdata([
+        tuple(int(t + (b - t) * y / max(height - 1, 1)) for t, b in zip(GRADIENT_TOP, GRADIENT_BOTTOM))
+        for y in range(height)
+    ])
+    return column.resize((width, height), Image.NEAREST)
+
+
+def _draw_card(text, width, height, font_path):
+    """카드 이미지 한 장 그리기"""
+    from PIL import ImageDraw
+
+    size = FONT_SIZE if font_path else 20  # 기본 폰트는 작음
+    font = load_font(font_path, size)
+    img = _background(width, height).copy()
+    draw = ImageDraw.Draw(img)
+
+    lines = wrap_text(text, font_path, size, width - SIDE_MARGIN * 2)
+    start_y = (height - len(lines) * LINE_HEIGHT) // 2
+    for i, line in enumerate(lines):
+        x = (width - int(text_width(font_path, size, line))) // 2
+        y = start_y + i * LINE_HEIGHT
+        # 그림자 효과
+        draw.text((x + 2, y + 2), line, font=font, fill=(0, 0, 0))
+        draw.text((x, y), line, font=font, fill=(255, 255, 255))
+    return img
+
+
+def title_card_image(text, width=1080, height=1920):
+    """타이틀 카드를 파일로 저장하지 않고 PIL 이미지로 반환 (rawpipe 슬라이드쇼 엔진용)"""
+    return _draw_card(text, width, height, find_font_path())
+
+
+def render_title_cards(cards, width=1080, height=1920):
+    """(텍스트, 출력 경로) 목록을 한 번에 렌더링. 각 카드의 결과 경로(실패 시 None) 목록 반환
+
+    폰트 선택, 폰트 로드, 배경 생성은 카드 수와 관계없이 한 번만 한다.
+    """
+    if not HAS_PIL:
+        return [None for _ in cards]
+
+    font_path = find_font_path()
+    results = []
+    with span("image.title_cards", cards=len(cards), font=os.path.basename(font_path or "default")) as s:
+        for text, output_path in cards:
+            output_path = Path(output_path)
+            tmp_path = None
+            try:
+                img = _draw_card(text, width, height, font_path)
+                fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+                os.close(fd)
+                img.save(tmp_path, "JPEG", quality=JPEG_QUALITY)
+                os.replace(tmp_path, output_path)
+                results.append(str(output_path))
+            except Exception as e:
+                if tmp_path:
+                    Path(tmp_path).unlink(missing_ok=True)
+                print(f"  ⚠️ 타이틀 카드 렌더링 실패 ({output_path.name}): {e}")
+                results.append(None)
+        s.set(rendered=sum(1 for path in results if path))
+    return results
+
+
+def render_title_card(text, output_path, width=1080, height=1920):
+    """타이틀 카드 한 장 렌더링 (실패 시 None)"""
+    return render_title_cards([(text, output_path)], width, height)[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="fallback 타이틀 카드 일괄 렌더링")
+    parser.add_argument("texts", nargs="+", help="카드에 넣을 텍스트")
+    parser.add_argument("--output-dir", default="output/cards", help="결과 디렉토리")
+    parser.add_argument("--width", type=int, default=1080)
+    parser.add_argument("--height", type=int, default=1920)
+    args = parser.parse_args()
+
+    if not HAS_PIL:
+        print("❌ PIL/Pillow가 필요합니다.")
+        sys.exit(1)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cards = [(text, output_dir / f"card_{i:02d}.jpg") for i, text in enumerate(args.texts, 1)]
+    paths = render_title_cards(cards, args.width, args.height)
+    print(f"✅ {sum(1 for path in paths if path)}/{len(paths)}개 카드 생성 완료")
+    if not all(paths):
+        sys.exit(1)
@@ -0,0 +1,267 @@
+"""외부 주제 카탈로그와 영속 색인
+
+주제 템플릿은 JSONL 카탈로그(기본값: data/topics.jsonl, 한 줄에 주제 하나)에서 읽는다.
+
+    {"topic": "기술 트렌드", "keywords": ["기술", "AI"], "image_prompts": ["...", "..."], "script": "..."}
+
+카탈로그는 수만 개 항목을 담을 수 있으므로 실행할 때마다 전체를 파싱하지 않는다. 처음 쓸 때 한 번만 훑어
+캐시 디렉토리(<캐시>/topics/<카탈로그 해시>/)에 색인을 만들고, 카탈로그의 크기/수정 시각이 바뀌었을 때만 다시 만든다.
+- offsets.bin: 항목별 줄 시작 위치 (8바이트 정수 배열). 무작위 선택은 이 파일에서 위치 하나만 읽는다.
+- shards/NN.json: 정규화한 주제/키워드 → 항목 번호, 한글 음절 2-gram 역색인. 키와 2-gram의 해시로 나눠 담으므로
+  조회 한 번은 조회어와 그 2-gram이 속한 조각만 읽는다 (역색인 항목: [키 번호, 항목 번호, 키의 2-gram 수]).
+- keys/NN.json: 키 번호 → 키 문자열 (KEY_BLOCK개씩). 조회어의 2-gram을 모두 가진 후보의 포함 여부 확인에만 읽는다.
+- meta.json: 카탈로그 서명과 항목 수 (마지막에 기록해 색인이 완성됐음을 표시)
+
+조회는 정규화한 키와 정확히 같으면 그 항목을, 아니면 2-gram이 겹치는 후보만 모아 Dice 계수로 점수를 매기고
+(입력이 키에 포함되면 가산점) min_score 이상인 최고 점수 항목을 고른다. 찾지 못하면 무작위로 고른다.
+
+사용법:
+    python scripts/topic_catalog.py build
+    python scripts/topic_catalog.py search "건강 습관"
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
+import unicodedata
+import zlib
+from collections import Counter
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.utils import load_config, get_env_var, write_json_atomic
+from scripts.asset_cache import get_cache_dir
+from scripts.tracing import span
+
+DEFAULT_CATALOG = Path(project_root) / "data" / "topics.jsonl"
+DEFAULT_MIN_SCORE = 0.3
+NGRAM = 2
+
+# 색인 형식이 바뀌면 올려서 기존 색인을 다시 만들게 함
+INDEX_VERSION = 2
+INDEX_SHARDS = 64
+KEY_BLOCK = 1024
+OFFSET_FORMAT = "<Q"
+OFFSET_SIZE = struct.calcsize(OFFSET_FORMAT)
+
+REQUIRED_FIELDS = ("topic", "image_prompts", "script")
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def normalize(text):
+    """조회/색인 공통 정규화 (NFC, 소문자, 문장 부호 제거, 공백 정리)"""
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def ngrams(text):
+    """공백을 뺀 문자열의 음절 n-gram 집합 (n보다 짧으면 문자열 자체)"""
+    compact = text.replace(" ", "")
+    if len(compact) < NGRAM:
+        return {compact} if compact else set()
+    return {compact[i:i + NGRAM] for i in range(len(compact) - NGRAM + 1)}
+
+
+def shard_of(text, shards=INDEX_SHARDS):
+    """키/2-gram이 들어갈 색인 조각 번호 (프로세스와 무관한 안정적인 해시)"""
+    return zlib.crc32(text.encode("utf-8")) % shards
+
+
+def catalog_path():
+    """카탈로그 경로 (환경 변수 TOPIC_CATALOG > config.yaml topics.catalog > data/topics.jsonl)"""
+    config = (load_config() or {}).get("topics") or {}
+    return Path(get_env_var("TOPIC_CATALOG", "") or config.get("catalog") or DEFAULT_CATALOG)
+
+
+class TopicCatalog:
+    """카탈로그 하나와 그 색인 (색인의 각 부분은 필요할 때 처음 읽음)"""
+
+    def __init__(self, path, min_score=DEFAULT_MIN_SCORE):
+        self.path = Path(path).absolute()
+        self.min_score = min_score
+        digest = hashlib.sha256(str(self.path).encode("utf-8")).hexdigest()[:16]
+        self.index_dir = get_cache_dir() / "topics" / digest
+        self._lock = threading.Lock()
+        self._meta = None
+        self._shards = {}
+        self._key_blocks = {}
+
+    def _signature(self):
+        stat = self.path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _ensure_index(self):
+        """색인 메타 정보 반환 (없거나 카탈로그가 바뀌었으면 다시 생성)"""
+        with self._lock:
+            if self._meta is not None:
+                return self._meta
+            signature = self._signature()
+            meta_path = self.index_dir / "meta.json"
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                if meta.get("signature") == signature and meta.get("version") == INDEX_VERSION:
+                    self._meta = meta
+                    return meta
+            except (OSError, ValueError):
+                pass
+            self._meta = self._build(signature)
+            return self._meta
+
+    def _build(self, signature):
+        """카탈로그를 한 번 훑어 offsets.bin, shards/, keys/, meta.json 작성"""
+        offsets = []
+        exact = {}
+        keys = []
+        with span("topics.index", catalog=str(self.path)) as s, open(self.path, "rb") as f:
+            offset = 0
+            for line_no, line in enumerate(f, 1):
+                start, offset = offset, offset + len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{self.path}:{line_no}: 잘못된 JSON ({e})")
+                missing = [field for field in REQUIRED_FIELDS if not entry.get(field)]
+                if missing:
+                    raise ValueError(f"{self.path}:{line_no}: 필수 항목 없음 {missing}")
+
+                entry_id = len(offsets)
+                offsets.append(start)
+                for key in {normalize(text) for text in [entry["topic"], *entry.get("keywords", [])]}:
+                    if key:
+                        exact.setdefault(key, entry_id)
+                        keys.append([key, entry_id])
+            s.set(entries=len(offsets), keys=len(keys))
+
+        shards = [{"exact": {}, "grams": {}} for _ in range(INDEX_SHARDS)]
+        for key, entry_id in exact.items():
+            shards[shard_of(key)]["exact"][key] = entry_id
+        for key_id, (key, entry_id) in enumerate(keys):
+            key_grams = ngrams(key)
+            for gram in key_grams:
+                shards[shard_of(gram)]["grams"].setdefault(gram, []).append([key_id, entry_id, len(key_grams)])
+
+        # 각 파일은 원자적으로 교체하고 meta.json을 마지막에 써서 완성을 표시. 이전 형식의 index.json은 지움
+        (self.index_dir / "index.json").unlink(missing_ok=True)
+        for name in ("shards", "keys"):
+            (self.index_dir / name).mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"".join(struct.pack(OFFSET_FORMAT, offset) for offset in offsets))
+        os.replace(tmp_path, self.index_dir / "offsets.bin")
+        for shard_id, shard in enumerate(shards):
+            write_json_atomic(self.index_dir / "shards" / f"{shard_id:02d}.json", shard)
+        for block in range(0, len(keys), KEY_BLOCK):
+            write_json_atomic(self.index_dir / "keys" / f"{block // KEY_BLOCK:02d}.json",
+                              [key for key, _ in keys[block:block + KEY_BLOCK]])
+        meta = {"version": INDEX_VERSION, "signature": signature, "count": len(offsets), "shards": INDEX_SHARDS}
+        write_json_atomic(self.index_dir / "meta.json", meta)
+        self._shards = {}
+        self._key_blocks = {}
+        return meta
+
+    def _load_part(self, cache, name, number):
+        """색인 조각 하나를 처음 쓸 때 읽음 (shards/NN.json, keys/NN.json)"""
+        with self._lock:
+            if number not in cache:
+                with open(self.index_dir / name / f"{number:02d}.json", "r", encoding="utf-8") as f:
+                    cache[number] = json.load(f)
+            return cache[number]
+
+    def _shard(self, text):
+        return self._load_part(self._shards, "shards", shard_of(text, self._ensure_index()["shards"]))
+
+    def _key(self, key_id):
+        return self._load_part(self._key_blocks, "keys", key_id // KEY_BLOCK)[key_id % KEY_BLOCK]
+
+    def __len__(self):
+        return self._ensure_index()["count"]
+
+    def entry(self, entry_id):
+        """항목 하나를 읽음 (offsets.bin에서 위치를 찾아 카탈로그의 그 줄만 파싱)"""
+        self._ensure_index()
+        with open(self.index_dir / "offsets.bin", "rb") as f:
+            f.seek(entry_id * OFFSET_SIZE)
+            (offset,) = struct.unpack(OFFSET_FORMAT, f.read(OFFSET_SIZE))
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def random_entry(self):
+        count = len(self)
+        if not count:
+            raise ValueError(f"주제 카탈로그가 비어 있습니다: {self.path}")
+        return self.entry(random.randrange(count))
+
+    def search(self, query, limit=5):
+        """조회어와 비슷한 항목 번호와 점수 목록 (점수 내림차순)"""
+        query = normalize(query)
+        if not query:
+            return []
+        exact = self._shard(query)["exact"]
+        if query in exact:
+            return [(exact[query], 2.0)]
+
+        query_grams = ngrams(query)
+        overlaps = Counter()
+        for gram in query_grams:
+            overlaps.update(tuple(posting) for posting in self._shard(gram)["grams"].get(gram, ()))
+
+        scores = {}
+        for (key_id, entry_id, gram_count), overlap in overlaps.items():
+            score = 2 * overlap / (len(query_grams) + gram_count)
+            if overlap == len(query_grams) and query in self._key(key_id):
+                score += 1.0
+            if score > scores.get(entry_id, 0.0):
+                scores[entry_id] = score
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def lookup(self, query):
+        """조회어에 가장 잘 맞는 항목 (min_score 미만이면 None)"""
+        results = self.search(query, limit=1)
+        if results and results[0][1] >= self.min_score:
+            return self.entry(results[0][0])
+        return None
+
+
+def get_catalog(path=None):
+    """카탈로그 인스턴스 반환 (프로세스 내 공유)"""
+    config = (load_config() or {}).get("topics") or {}
+    path = Path(path or catalog_path()).absolute()
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = TopicCatalog(path, config.get("min_score", DEFAULT_MIN_SCORE))
+        return _catalogs[path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주제 카탈로그 색인/검색")
+    parser.add_argument("--catalog", default=None, help="카탈로그 경로 (기본값: topics.catalog)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="색인 (다시) 생성")
+    search_parser = subparsers.add_parser("search", help="주제 검색")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = get_catalog(args.catalog)
+    if args.command == "build":
+        meta = catalog._build(catalog._signature())
+        print(f"✅ 색인 생성 완료: {meta['count']}개 주제 → {catalog.index_dir}")
+    else:
+        for entry_id, score in catalog.search(args.query, args.limit):
+            print(f"  {score:.2f}  {catalog.entry(entry_id)['topic']}")
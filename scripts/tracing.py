@@ -0,0 +1,171 @@
+"""단계/외부 호출 단위 트레이싱
+
+span()으로 감싼 구간의 시작 시각, 소요 시간, 성공 여부와 속성(바이트 수, 이미지 수, 캐시 적중, 종료 코드 등)을
+기록한다. start_trace()로 트레이스를 시작하면 span이 끝날 때마다 JSONL 파일에 한 줄씩 추가되고,
+end_trace()는 이름별 요약 표를 출력한다.
+
+    start_trace(get_output_dir() / "trace.jsonl")
+    with span("stage.generate_images", images=3) as s:
+        ...
+        s.set(cache_hits=2)
+    end_trace()
+
+부모 span은 스레드별로 추적한다. 스레드 풀에서 실행되는 작업은 parent 인자로 부모를 넘긴다.
+"""
+import json
+import os
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+_local = threading.local()
+_lock = threading.Lock()
+_trace = {"id": None, "file": None, "records": []}
+
+
+class Span:
+    """진행 중인 구간 하나"""
+
+    def __init__(self, name, parent_id=None, attrs=None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attrs = dict(attrs or {})
+        self.status = "ok"
+        self.error = None
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        self.duration = None
+
+    def set(self, **attrs):
+        """속성 추가/갱신"""
+        self.attrs.update(attrs)
+
+    def fail(self, error):
+        """실패로 표시 (예외 없이 실패를 반환하는 함수용)"""
+        self.status = "error"
+        self.error = str(error)[:500]
+
+    def to_record(self):
+        return {
+            "trace_id": _trace["id"],
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_s": round(self.duration, 6),
+            "status": self.status,
+            "error": self.error,
+            "thread": threading.current_thread().name,
+            "attrs": self.attrs,
+        }
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current_span():
+    """현재 스레드에서 진행 중인 span (없으면 None)"""
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name, parent=None, **attrs):
+    """구간 측정. 예외가 발생하면 error 상태로 기록하고 다시 던진다."""
+    parent = parent or current_span()
+    item = Span(name, parent.span_id if parent else None, attrs)
+    stack = _stack()
+    stack.append(item)
+    try:
+        yield item
+    except BaseException as e:
+        item.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        stack.pop()
+        item.duration = time.perf_counter() - item._perf_start
+        _emit(item.to_record())
+
+
+def _emit(record):
+    with _lock:
+        _trace["records"].append(record)
+        if _trace["file"]:
+            _trace["file"].write(json.dumps(record, ensure_ascii=False) + "\n")
+            _trace["file"].flush()
+
+
+def start_trace(path=None, trace_id=None):
+    """새 트레이스 시작. path를 주면 span을 JSONL로 기록한다."""
+    end_trace(print_summary=False)
+    with _lock:
+        _trace["id"] = trace_id or uuid.uuid4().hex[:16]
+        _trace["records"] = []
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            _trace["file"] = open(path, "w", encoding="utf-8")
+    return _trace["id"]
+
+
+def end_trace(print_summary=True):
+    """트레이스 종료 (파일 닫기, 요약 표 출력)"""
+    with _lock:
+        if _trace["file"]:
+            _trace["file"].close()
+            _trace["file"] = None
+        records = list(_trace["records"])
+    if print_summary and records:
+        print_summary_table(records)
+    return records
+
+
+def summarize(records):
+    """span 이름별 호출 수, 총/최대 소요 시간, 오류 수, 바이트 합계"""
+    summary = {}
+    for record in records:
+        item = summary.setdefault(record["name"], {"count": 0, "total_s": 0.0, "max_s": 0.0, "errors": 0, "bytes": 0})
+        item["count"] += 1
+        item["total_s"] += record["duration_s"]
+        item["max_s"] = max(item["max_s"], record["duration_s"])
+        item["errors"] += record["status"] != "ok"
+        item["bytes"] += record["attrs"].get("bytes", 0) or 0
+    return summary
+
+
+def print_summary_table(records):
+    """요약 표 출력 (총 소요 시간 내림차순)"""
+    summary = summarize(records)
+    print(f"\n⏱️ 트레이스 요약 ({_trace['id']})")
+    print(f"  {'span':<28} {'count':>5} {'total(s)':>9} {'max(s)':>8} {'err':>4} {'MB':>8}")
+    for name, item in sorted(summary.items(), key=lambda kv: kv[1]["total_s"], reverse=True):
+        print(f"  {name:<28} {item['count']:>5} {item['total_s']:>9.2f} {item['max_s']:>8.2f} "
+              f"{item['errors']:>4} {item['bytes'] / 1024 / 1024:>8.1f}")
+
+
+def traced_run(cmd, name=None, **kwargs):
+    """subprocess.run을 span으로 감싸 실행 (종료 코드, 출력 파일 크기 기록)
+
+    name을 생략하면 실행 파일 이름(ffmpeg, ffprobe 등)을 사용한다.
+    check=True면 subprocess.run과 동일하게 CalledProcessError를 던진다.
+    """
+    kwargs.setdefault("capture_output", True)
+    kwargs.setdefault("text", True)
+    with span(name or os.path.basename(str(cmd[0]))) as s:
+        try:
+            result = subprocess.run(cmd, **kwargs)
+        except subprocess.CalledProcessError as e:
+            s.set(exit_code=e.returncode)
+            raise
+        s.set(exit_code=result.returncode)
+        if result.returncode != 0:
+            s.fail((result.stderr or "")[-500:] if isinstance(result.stderr, str) else f"exit {result.returncode}")
+        output_path = str(cmd[-1])
+        if output_path not in ("-", "pipe:1") and os.path.isfile(output_path):
+            s.set(bytes=os.path.getsize(output_path))
+        return result
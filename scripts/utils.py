@@ -1,32 +1,83 @@
 """공통 유틸리티 함수"""
+import copy
 import os
 import json
-import yaml
+import subprocess
+import tempfile
+import threading
+import time
 from pathlib import Path
 
+from scripts.tracing import traced_run
+
+
+# 출력 루트 기본값 (환경 변수 AUTOVIDEO_OUTPUT_DIR로 변경)
+DEFAULT_OUTPUT_ROOT = "output"
+
+
+def get_output_root():
+    """모든 작업 공간이 놓이는 출력 루트 디렉토리"""
+    return Path(get_env_var("AUTOVIDEO_OUTPUT_DIR", "") or DEFAULT_OUTPUT_ROOT)
+
 
 def get_output_dir():
-    """출력 디렉토리 경로 반환"""
-    output_dir = Path("output")
-    output_dir.mkdir(exist_ok=True)
+    """출력 디렉토리 경로 반환
+    
+    환경 변수 AUTOVIDEO_JOB_ID가 있으면 작업별 공간(<출력 루트>/jobs/<작업 id>/)을,
+    없으면 출력 루트를 그대로 사용한다 (scripts/workspace.py 참고).
+    """
+    job_id = get_env_var("AUTOVIDEO_JOB_ID", "")
+    output_dir = get_output_root() / "jobs" / job_id if job_id else get_output_root()
+    output_dir.mkdir(parents=True, exist_ok=True)
     return output_dir
 
 
+_config_cache = {"key": None, "config": {}}
+_config_lock = threading.Lock()
+
+
 def load_config():
-    """설정 파일 로드"""
+    """설정 파일 로드
+
+    파일이 바뀌지 않았으면 처음 파싱한 결과의 사본을 돌려준다 (단계마다 여러 번 호출되므로).
+    PyYAML은 설정 파일이 있을 때 처음 한 번만 import한다.
+    """
     config_path = Path("config.yaml")
-    if config_path.exists():
-        with open(config_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    return {}
+    try:
+        stat = config_path.stat()
+    except OSError:
+        return {}
+    key = (str(config_path.absolute()), stat.st_size, stat.st_mtime_ns)
+    with _config_lock:
+        if _config_cache["key"] != key:
+            import yaml
+
+            with open(config_path, "r", encoding="utf-8") as f:
+                _config_cache["config"] = yaml.safe_load(f) or {}
+            _config_cache["key"] = key
+        return copy.deepcopy(_config_cache["config"])
+
+
+def write_json_atomic(path, data):
+    """JSON을 같은 디렉토리의 임시 파일에 쓴 뒤 원자적으로 이름 변경 (읽는 쪽이 반쯤 쓴 파일을 보지 않음)"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return str(path)
 
 
 def save_metadata(data, filename="metadata.json"):
-    """메타데이터 저장"""
-    output_dir = get_output_dir()
-    metadata_path = output_dir / filename
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """메타데이터 저장 (원자적 쓰기)"""
+    return write_json_atomic(get_output_dir() / filename, data)
 
 
 def load_metadata(filename="metadata.json"):
@@ -43,3 +94,54 @@ def get_env_var(key, default=None):
     """환경 변수 가져오기"""
     return os.getenv(key, default)
 
+
+def probe_duration(media_path):
+    """ffprobe로 미디어 길이(초) 측정 (실패 시 None)"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        str(media_path)
+    ]
+    try:
+        result = traced_run(cmd, name="ffprobe", check=True)
+        return float(result.stdout.strip())
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        return None
+
+
+def stream_to_file(response, filepath, max_bytes=None, chunk_size=64 * 1024):
+    """HTTP 스트리밍 응답을 청크 단위로 임시 파일에 쓰고 원자적으로 이름 변경
+    
+    max_bytes를 넘으면 ValueError를 내고 임시 파일을 지운다. 반환값: 기록한 바이트 수
+    """
+    filepath = Path(filepath)
+    declared = int(response.headers.get("Content-Length") or 0)
+    if max_bytes and declared > max_bytes:
+        response.close()
+        raise ValueError(f"응답 크기 초과: {declared} > {max_bytes} bytes")
+    
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".part")
+    written = 0
+    started = time.perf_counter()
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                written += len(chunk)
+                if max_bytes and written > max_bytes:
+                    raise ValueError(f"응답 크기 초과: {written} > {max_bytes} bytes")
+                f.write(chunk)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    finally:
+        response.close()
+    
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    print(f"  📥 {filepath.name}: {written / 1024:.0f}KB, {written / 1024 / elapsed:.0f}KB/s")
+    return written
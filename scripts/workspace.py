@@ -0,0 +1,240 @@
+"""작업별 격리 작업 공간과 정리/보관 정책
+
+작업 id가 있으면 모든 단계의 출력(metadata.json, image_01.jpg, final_shorts.mp4 등)이
+<출력 루트>/jobs/<작업 id>/ 아래에 생기므로, 한 머신에서 여러 작업을 동시에 실행해도 파일이 겹치지 않는다.
+작업 id는 환경 변수 AUTOVIDEO_JOB_ID로 전달되며 utils.get_output_dir()가 이를 읽는다.
+
+실행 중인 작업 공간은 .lock 파일에 대한 fcntl 잠금으로 표시해 같은 id의 중복 실행과 정리 대상에서 제외한다
+(잠금은 프로세스가 끝나면 운영체제가 풀어 주므로 비정상 종료로 남는 잠금이 없다).
+
+사용법:
+    python scripts/pipeline.py --new-job
+    python scripts/workspace.py list
+    python scripts/workspace.py prune --days 7 --keep 20 --dry-run
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 프로젝트 루트를 sys.path에 추가
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from scripts.utils import get_output_root, get_output_dir, load_config
+
+LOCK_NAME = ".lock"
+
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_KEEP_LAST = 20
+
+# 성공한 작업에서 지워도 되는 중간 파일 (최종 영상, 자막, 음성, 메타데이터, 트레이스는 유지)
+INTERMEDIATE_PATTERNS = ["image_*.jpg", "video_raw.mp4", "video_with_subtitle.mp4", "*_speech16k.mp3"]
+
+
+def workspace_config():
+    """config.yaml의 workspace 섹션 (없으면 기본값)"""
+    config = (load_config() or {}).get("workspace") or {}
+    return {
+        "retention_days": config.get("retention_days", DEFAULT_RETENTION_DAYS),
+        "keep_last": config.get("keep_last", DEFAULT_KEEP_LAST),
+        "clean_intermediates": bool(config.get("clean_intermediates", False)),
+    }
+
+
+def new_job_id():
+    """시각 + 임의 접미사로 된 작업 id (정렬하면 생성 순서)"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def validate_job_id(job_id):
+    """디렉토리 이름으로 쓸 수 있는 작업 id인지 확인 (경로 구분자, ".", ".." 불가). 아니면 ValueError"""
+    if not job_id or "/" in job_id or "\\" in job_id or job_id in (".", ".."):
+        raise ValueError(f"잘못된 작업 id: {job_id!r}")
+    return job_id
+
+
+def activate_job(job_id):
+    """이 프로세스의 작업 id를 지정하고 작업 공간 경로 반환"""
+    validate_job_id(job_id)
+    os.environ["AUTOVIDEO_JOB_ID"] = job_id
+    return get_output_dir()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_pid(lock_path):
+    """잠금 파일의 프로세스 id (읽을 수 없으면 None)"""
+    try:
+        return int(lock_path.read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def is_locked(job_dir):
+    """실행 중인 프로세스가 잡고 있는 작업 공간인지"""
+    lock_path = Path(job_dir) / LOCK_NAME
+    if not lock_path.exists():
+        return False
+    if fcntl is None:
+        # 프로세스 id를 읽을 수 있고 그 프로세스가 종료된 경우에만 남은 잠금으로 봄
+        pid = _lock_pid(lock_path)
+        return pid is None or _pid_alive(pid)
+    try:
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+@contextmanager
+def job_lock(job_dir):
+    """작업 공간 잠금. 같은 작업 공간을 다른 프로세스가 쓰고 있으면 RuntimeError
+
+    잠금 파일은 지우지 않는다 (지우면 그 사이에 옛 파일을 연 프로세스와 새 파일을 만든 프로세스가
+    동시에 잠금을 얻을 수 있음). 파일 내용(프로세스 id)은 참고용이다.
+    """
+    if fcntl is None:
+        with _pid_lock(Path(job_dir)):
+            yield Path(job_dir)
+        return
+
+    lock_path = Path(job_dir) / LOCK_NAME
+    with open(lock_path, "a+") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"이미 실행 중인 작업 공간입니다: {job_dir}")
+        try:
+            lock_file.truncate(0)
+            lock_file.write(str(os.getpid()))
+            lock_file.flush()
+            yield Path(job_dir)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _pid_lock(job_dir):
+    """fcntl이 없는 플랫폼용 잠금: 프로세스 id를 쓴 임시 파일을 os.link로 한 번에 잠금 파일로 만듦"""
+    lock_path = job_dir / LOCK_NAME
+    tmp_path = job_dir / f"{LOCK_NAME}.{os.getpid()}.tmp"
+    tmp_path.write_text(str(os.getpid()))
+    try:
+        try:
+            os.link(tmp_path, lock_path)
+        except FileExistsError:
+            pid = _lock_pid(lock_path)
+            if pid is None or _pid_alive(pid):
+                raise RuntimeError(f"이미 실행 중인 작업 공간입니다: {job_dir}")
+            lock_path.unlink()  # 비정상 종료로 남은 잠금
+            try:
+                os.link(tmp_path, lock_path)
+            except FileExistsError:
+                raise RuntimeError(f"이미 실행 중인 작업 공간입니다: {job_dir}")
+    finally:
+        tmp_path.unlink()
+    try:
+        yield
+    finally:
+        if _lock_pid(lock_path) == os.getpid():
+            lock_path.unlink()
+
+
+def clean_intermediates(job_dir):
+    """작업 공간에서 중간 파일 삭제. 반환값: 지운 바이트 수"""
+    removed = 0
+    for pattern in INTERMEDIATE_PATTERNS:
+        for path in Path(job_dir).glob(pattern):
+            removed += path.stat().st_size
+            path.unlink()
+    return removed
+
+
+def list_workspaces():
+    """작업 공간 목록 (최근 수정 순). 각 항목: id, path, mtime, bytes, locked"""
+    jobs_dir = get_output_root() / "jobs"
+    if not jobs_dir.exists():
+        return []
+
+    workspaces = []
+    for path in jobs_dir.iterdir():
+        if not path.is_dir():
+            continue
+        files = [item for item in path.rglob("*") if item.is_file()]
+        workspaces.append({
+            "id": path.name,
+            "path": path,
+            "mtime": max([item.stat().st_mtime for item in files] + [path.stat().st_mtime]),
+            "bytes": sum(item.stat().st_size for item in files),
+            "locked": is_locked(path),
+        })
+    return sorted(workspaces, key=lambda item: item["mtime"], reverse=True)
+
+
+def prune_workspaces(retention_days=None, keep_last=None, dry_run=False):
+    """보관 정책에 따라 오래된 작업 공간 삭제
+
+    최근 keep_last개는 항상 남기고, 나머지 중 retention_days보다 오래된 것을 지운다.
+    실행 중(잠금)인 작업 공간은 지우지 않는다. 반환값: 삭제한(dry_run이면 삭제할) 작업 공간 목록
+    """
+    config = workspace_config()
+    retention_days = config["retention_days"] if retention_days is None else retention_days
+    keep_last = config["keep_last"] if keep_last is None else keep_last
+    cutoff = time.time() - retention_days * 86400
+
+    removed = []
+    for workspace in list_workspaces()[keep_last:]:
+        if workspace["locked"] or workspace["mtime"] >= cutoff:
+            continue
+        if not dry_run:
+            shutil.rmtree(workspace["path"], ignore_errors=True)
+        removed.append(workspace)
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="작업 공간 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="작업 공간 목록")
+    prune_parser = subparsers.add_parser("prune", help="보관 정책에 따라 오래된 작업 공간 삭제")
+    prune_parser.add_argument("--days", type=float, default=None, help="보관 기간(일), 기본값: workspace.retention_days")
+    prune_parser.add_argument("--keep", type=int, default=None, help="항상 남길 최근 작업 수, 기본값: workspace.keep_last")
+    prune_parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 출력")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for workspace in list_workspaces():
+            modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(workspace["mtime"]))
+            state = "🔒" if workspace["locked"] else "  "
+            print(f"{state} {workspace['id']:<24} {modified} {workspace['bytes'] / 1024 / 1024:>8.1f}MB")
+    else:
+        removed = prune_workspaces(args.days, args.keep, args.dry_run)
+        freed = sum(workspace["bytes"] for workspace in removed)
+        verb = "삭제 예정" if args.dry_run else "삭제"
+        for workspace in removed:
+            print(f"  🗑️ {workspace['id']}")
+        print(f"✅ {len(removed)}개 작업 공간 {verb} ({freed / 1024 / 1024:.1f}MB)")